@@ -4,12 +4,15 @@ Switch Port Webhook API endpoints.
 This module provides FastAPI router with endpoints for processing webhook events
 related to switch port resource reservations with VLAN configuration.
 """
-from typing import Optional, Union
+import asyncio
+import logging
+from typing import Callable, Optional, Set, Union
 
 from fastapi import APIRouter, Request, Header, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 
 from . import config, models, utils
+from .services import idempotency, switch
 
 logger = config.logger
 
@@ -18,124 +21,294 @@ EVENT_START = 'EVENT_START'
 EVENT_END = 'EVENT_END'
 EVENT_DELETED = 'EVENT_DELETED'
 
+# Handler and response action for each single-event type, resolved once per request
+_SINGLE_EVENT_HANDLERS = {
+    EVENT_START: (utils.handle_switch_port_start_event, "configure"),
+    EVENT_END: (utils.handle_switch_port_end_event, "restore"),
+}
+
 router = APIRouter()
 
-@router.post("/webhook")
-async def handle_webhook(
+# Switch operations still running after their webhook was acknowledged
+_background_tasks: Set[asyncio.Task] = set()
+
+
+async def _duplicate_response(dedup_key: tuple, resource_name: str, user_id: Optional[str]) -> Response:
+    """
+    Build the response for a duplicate event delivery.
+    
+    Args:
+        dedup_key: Deduplication key of the event
+        resource_name: Name of the switch port resource
+        user_id: User identifier
+        
+    Returns:
+        The stored response of the original delivery, or a duplicate
+        acknowledgement if the event is still being processed
+    """
+    body = await idempotency.get_response(dedup_key)
+    if body is not None:
+        return Response(content=body, media_type="application/json")
+    return utils.create_duplicate_response(resource_name, user_id)
+
+
+async def _finish_in_background(
+    handler: Callable[..., bool],
     payload: Union[models.WebhookPayload, models.EventWebhookPayload],
-    request: Request, 
-    x_webhook_signature: Optional[str] = Header(None)
-) -> JSONResponse:
+    dedup_key: tuple,
+    success_response: Response,
+    resource_name: str,
+    action: str
+) -> None:
     """
-    Handle incoming webhook events for switch port reservations.
-    Only processes events for Switch Port resource types.
+    Run an acknowledged switch operation and record its outcome for redeliveries.
+    
+    Args:
+        handler: Event handler performing the switch operation and notifications
+        payload: Validated payload passed to the handler
+        dedup_key: Deduplication key of the event
+        success_response: Response stored for redeliveries once the operation succeeds
+        resource_name: Name of the switch port resource
+        action: Operation performed, for logging
     """
-    logger.info(f"Received webhook request. Attempting to parse payload.")
-    logger.debug(f"Payload: {payload}")
-    raw_payload = await utils.verify_webhook_signature(request, x_webhook_signature)
+    try:
+        success = await switch.run_switch_operation(handler, payload)
+    except Exception as e:
+        logger.error("Unexpected error while trying to %s switch port '%s': %s", action, resource_name, e)
+        success = False
     
-    # Handle single event payload format
-    if isinstance(payload, models.WebhookPayload):
-        logger.info(
-            f"Processing single switch port webhook event. Event Type: '{payload.event_type}', "
-            f"User: '{payload.username}', Resource: '{payload.resource_name}', "
-            f"Resource Type: '{payload.resource_type}'."
-        )
+    if success:
+        await idempotency.store_response(dedup_key, success_response.body)
+    else:
+        # Let a redelivery of the event try again
+        await idempotency.release_event(dedup_key)
+        logger.error("Failed to %s switch port '%s' in the background", action, resource_name)
 
-        # Check if this is a Switch Port resource type
-        if payload.resource_type != "Switch Port":
-            logger.info(f"Skipping non-Switch Port resource '{payload.resource_name}' of type '{payload.resource_type}'. No action taken.")
-            return JSONResponse({
-                "status": "success",
-                "message": f"No action needed for resource type '{payload.resource_type}'."
-            })
-
-        # Process the single switch port event
-        if payload.event_type == EVENT_START:
-            if utils.handle_switch_port_start_event(
-                payload
-            ):
-                return utils.create_success_response("configure", payload.resource_name, payload.user_id)
-            else:
-                logger.error(f"Failed to configure switch port '{payload.resource_name}' for event {payload.event_id}")
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Failed to configure switch port '{payload.resource_name}'"
-                )
 
-        elif payload.event_type == EVENT_END:
-            if utils.handle_switch_port_end_event(
-                payload
-            ):
-                return utils.create_success_response("restore", payload.resource_name, payload.user_id)
-            else:
-                logger.error(f"Failed to restore switch port '{payload.resource_name}' for event {payload.event_id}")
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Failed to restore switch port '{payload.resource_name}'"
-                )
-        else:
-            logger.info(f"No action configured for event type '{payload.event_type}'.")
-            return JSONResponse({
-                "status": "success",
-                "message": f"No action needed for event type '{payload.event_type}'."
-            })
-
-    elif isinstance(payload, models.EventWebhookPayload):
-        logger.info(
-            f"Processing switch port {payload.event_type} webhook. "
-            f"Resource Name: '{payload.data.resource.name}'."
+def _schedule_in_background(
+    handler: Callable[..., bool],
+    payload: Union[models.WebhookPayload, models.EventWebhookPayload],
+    dedup_key: tuple,
+    success_response: Response,
+    resource_name: str,
+    action: str
+) -> None:
+    """Start a switch operation that completes after the webhook response has been sent."""
+    task = asyncio.create_task(
+        _finish_in_background(handler, payload, dedup_key, success_response, resource_name, action)
+    )
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def wait_for_background_tasks() -> None:
+    """Wait for acknowledged switch operations that are still running."""
+    if _background_tasks:
+        await asyncio.gather(*_background_tasks, return_exceptions=True)
+
+
+async def _process_single_event(payload: models.WebhookPayload) -> Response:
+    """
+    Process a single-event payload (EVENT_START / EVENT_END).
+    
+    Args:
+        payload: Validated single-event payload
+        
+    Returns:
+        Response for the webhook sender
+        
+    Raises:
+        HTTPException: If the switch port could not be configured or restored
+    """
+    logger.info(
+        "Processing single switch port webhook event. Event Type: '%s', "
+        "User: '%s', Resource: '%s', Resource Type: '%s'.",
+        payload.event_type, payload.username, payload.resource_name, payload.resource_type
+    )
+
+    # Check if this is a Switch Port resource type
+    if payload.resource_type != "Switch Port":
+        logger.info("Skipping non-Switch Port resource '%s' of type '%s'. No action taken.", payload.resource_name, payload.resource_type)
+        return utils.create_no_action_response(f"No action needed for resource type '{payload.resource_type}'.")
+
+    # Process the single switch port event
+    handler_entry = _SINGLE_EVENT_HANDLERS.get(payload.event_type)
+    if handler_entry is None:
+        logger.info("No action configured for event type '%s'.", payload.event_type)
+        return utils.create_no_action_response(f"No action needed for event type '{payload.event_type}'.")
+
+    handler, action = handler_entry
+    dedup_key = (str(payload.webhook_id), payload.event_id, payload.event_type)
+    if not await idempotency.claim_event(dedup_key):
+        logger.info("Duplicate %s event %s for switch port '%s'. Skipping.", payload.event_type, payload.event_id, payload.resource_name)
+        return await _duplicate_response(dedup_key, payload.resource_name, payload.user_id)
+
+    if config.SWITCH_ASYNC_PROCESSING:
+        _schedule_in_background(
+            handler, payload, dedup_key,
+            utils.create_success_response(action, payload.resource_name, payload.user_id),
+            payload.resource_name, action
         )
+        return utils.create_accepted_response(action, payload.resource_name, payload.user_id)
+
+    try:
+        success = await switch.run_switch_operation(handler, payload)
+    except Exception:
+        # Let a redelivery of the event try again
+        await idempotency.release_event(dedup_key)
+        raise
+    
+    if success:
+        response = utils.create_success_response(action, payload.resource_name, payload.user_id)
+        await idempotency.store_response(dedup_key, response.body)
+        return response
+    else:
+        await idempotency.release_event(dedup_key)
+        logger.error("Failed to %s switch port '%s' for event %s", action, payload.resource_name, payload.event_id)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to {action} switch port '{payload.resource_name}'"
+        )
+
+
+async def _process_event_payload(payload: models.EventWebhookPayload) -> Response:
+    """
+    Process an event-data payload (EVENT_DELETED).
+    
+    Args:
+        payload: Validated event-data payload
         
-        if payload.event_type == EVENT_DELETED:
-            now = utils.parse_timestamp(payload.timestamp) # Parse timestamp from string to datetime
-            
-            # Parse start and end times from string to datetime
-            reservation_start = utils.parse_timestamp(payload.data.start)
-            reservation_end = utils.parse_timestamp(payload.data.end)
-
-            logger.debug(f"Current time (UTC): {now}, Reservation Start: {reservation_start}, Reservation End: {reservation_end}")
-
-            if reservation_start <= now < reservation_end:
-                logger.info(f"Reservation for switch port '{payload.data.resource.name}' is currently active. Restoring to default VLAN.")
-                if utils.handle_switch_port_end_event(
-                    payload
-                ):
-                    logger.info(f"Successfully restored switch port '{payload.data.resource.name}' to default VLAN due to EVENT_DELETED.")
-                    return JSONResponse({
+    Returns:
+        Response for the webhook sender
+        
+    Raises:
+        HTTPException: If the switch port could not be restored
+    """
+    logger.info(
+        "Processing switch port %s webhook. Resource Name: '%s'.",
+        payload.event_type, payload.data.resource.name
+    )
+    
+    if payload.event_type == EVENT_DELETED:
+        now = utils.parse_timestamp(payload.timestamp) # Parse timestamp from string to datetime
+        
+        # Parse start and end times from string to datetime
+        reservation_start = utils.parse_timestamp(payload.data.start)
+        reservation_end = utils.parse_timestamp(payload.data.end)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Current time (UTC): %s, Reservation Start: %s, Reservation End: %s", now, reservation_start, reservation_end)
+
+        # Compare as UTC POSIX timestamps, so naive and aware values compare the same on any host
+        if utils.utc_timestamp(reservation_start) <= utils.utc_timestamp(now) < utils.utc_timestamp(reservation_end):
+            dedup_key = (str(payload.webhook_id), str(payload.data.id), payload.event_type)
+            if not await idempotency.claim_event(dedup_key):
+                logger.info("Duplicate %s event %s for switch port '%s'. Skipping.", EVENT_DELETED, payload.data.id, payload.data.resource.name)
+                return await _duplicate_response(dedup_key, payload.data.resource.name, payload.data.keycloak_id)
+
+            logger.info("Reservation for switch port '%s' is currently active. Restoring to default VLAN.", payload.data.resource.name)
+            if config.SWITCH_ASYNC_PROCESSING:
+                _schedule_in_background(
+                    utils.handle_switch_port_end_event, payload, dedup_key,
+                    utils.ORJSONResponse({
                         "status": "success", 
                         "message": f"Switch port '{payload.data.resource.name}' restored to default VLAN due to active reservation deletion."
-                    })
-                else:
-                    logger.error(f"Failed to restore switch port '{payload.data.resource.name}' for EVENT_DELETED.")
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail=f"Failed to restore switch port '{payload.data.resource.name}' after EVENT_DELETED."
-                    )
-            else:
-                logger.info(f"Reservation for switch port '{payload.data.resource.name}' is not currently active. No action taken for EVENT_DELETED.")
-                return JSONResponse({
-                    "status": "success",
-                    "message": f"No action taken for switch port '{payload.data.resource.name}' as reservation is not currently active."
+                    }),
+                    payload.data.resource.name, "restore"
+                )
+                return utils.create_accepted_response("restore", payload.data.resource.name, payload.data.keycloak_id)
+            
+            try:
+                success = await switch.run_switch_operation(
+                    utils.handle_switch_port_end_event, payload
+                )
+            except Exception:
+                # Let a redelivery of the event try again
+                await idempotency.release_event(dedup_key)
+                raise
+            
+            if success:
+                logger.info("Successfully restored switch port '%s' to default VLAN due to EVENT_DELETED.", payload.data.resource.name)
+                response = utils.ORJSONResponse({
+                    "status": "success", 
+                    "message": f"Switch port '{payload.data.resource.name}' restored to default VLAN due to active reservation deletion."
                 })
+                await idempotency.store_response(dedup_key, response.body)
+                return response
+            else:
+                await idempotency.release_event(dedup_key)
+                logger.error("Failed to restore switch port '%s' for EVENT_DELETED.", payload.data.resource.name)
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Failed to restore switch port '{payload.data.resource.name}' after EVENT_DELETED."
+                )
         else:
-            return JSONResponse({
-                "status": "success",
-                "message": f"No action needed for event type '{payload.event_type}'."
-            })
+            logger.info("Reservation for switch port '%s' is not currently active. No action taken for EVENT_DELETED.", payload.data.resource.name)
+            return utils.create_no_action_response(f"No action taken for switch port '{payload.data.resource.name}' as reservation is not currently active.")
     else:
-        # If event type is not recognized, return success with no action needed
-        event_type_to_log = payload.event_type if hasattr(payload, 'event_type') else "unknown"
-        username_to_log = payload.username if isinstance(payload, models.WebhookPayload) and hasattr(payload, 'username') else "N/A"
-        
-        logger.info(f"Received event type '{event_type_to_log}' for user {username_to_log}. No action configured for this event type.")
-        return JSONResponse({
-            "status": "success",
-            "message": f"No action needed for event type '{event_type_to_log}'."
-        })
+        return utils.create_no_action_response(f"No action needed for event type '{payload.event_type}'.")
+
+
+# Processor for each payload model, selected once the body has been validated
+_PAYLOAD_PROCESSORS = {
+    models.WebhookPayload: _process_single_event,
+    models.EventWebhookPayload: _process_event_payload,
+}
+
+# Request body schema for the OpenAPI document: the handler reads the raw body itself
+# to verify its signature, so FastAPI cannot derive it; the models go to components
+_WEBHOOK_BODY_SCHEMA = models.webhook_payload_adapter.json_schema(ref_template="#/components/schemas/{model}")
+WEBHOOK_SCHEMA_COMPONENTS = _WEBHOOK_BODY_SCHEMA.pop("$defs", {})
+
+
+@router.post(
+    "/webhook",
+    response_model=None,
+    response_class=utils.ORJSONResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": _WEBHOOK_BODY_SCHEMA}},
+        }
+    },
+)
+async def handle_webhook(
+    request: Request, 
+    x_webhook_signature: Optional[str] = Header(None)
+) -> Response:
+    """
+    Handle incoming webhook events for switch port reservations.
+    Only processes events for Switch Port resource types.
+    """
+    logger.info("Received webhook request. Attempting to parse payload.")
+    raw_payload = await utils.verify_webhook_signature(request, x_webhook_signature)
+    
+    # Acknowledge events for other resource types without validating the payload
+    resource_type = utils.peek_foreign_resource_type(raw_payload)
+    if resource_type is not None:
+        logger.info("Skipping non-Switch Port resource of type '%s'. No action taken.", resource_type)
+        return utils.create_no_action_response(f"No action needed for resource type '{resource_type}'.")
+    
+    payload = utils.parse_webhook_payload(raw_payload)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Payload: %r", payload)
+    
+    processor = _PAYLOAD_PROCESSORS.get(type(payload))
+    if processor is not None:
+        return await processor(payload)
+    
+    # If event type is not recognized, return success with no action needed
+    event_type_to_log = payload.event_type if hasattr(payload, 'event_type') else "unknown"
+    username_to_log = payload.username if isinstance(payload, models.WebhookPayload) and hasattr(payload, 'username') else "N/A"
+    
+    logger.info("Received event type '%s' for user %s. No action configured for this event type.", event_type_to_log, username_to_log)
+    return utils.create_no_action_response(f"No action needed for event type '{event_type_to_log}'.")
+
+
+# Health check body, encoded once: the probe endpoint is served as a plain Starlette route
+_HEALTHZ_BODY = b'{"status":"healthy","service":"switch-port-webhook"}'
 
 
-@router.get("/healthz")
-def health_check() -> dict:
+async def health_check(request: Request) -> Response:
     """Health check endpoint."""
-    return {"status": "healthy", "service": "switch-port-webhook"}
+    return Response(content=_HEALTHZ_BODY, media_type="application/json")
@@ -4,8 +4,10 @@ Application configuration module.
 This module handles all configuration settings for the webhook client,
 including logging setup and Kubernetes configuration management.
 """
+import importlib.util
 import logging
 import os
+from dataclasses import dataclass, field
 from typing import Optional
 
 
@@ -19,7 +21,12 @@ class HealthzFilter(logging.Filter):
     
     def filter(self, record: logging.LogRecord) -> bool:
         """Filter out log records containing '/healthz' requests."""
-        return record.getMessage().find("/healthz") == -1
+        # uvicorn access records use '%s - "%s %s HTTP/%s" %d' with the request
+        # path as the third argument, so the message does not need formatting
+        args = record.args
+        if isinstance(args, tuple) and len(args) >= 3 and isinstance(args[2], str):
+            return "/healthz" not in args[2]
+        return "/healthz" not in record.getMessage()
 
 
 class LoggingConfig:
@@ -55,40 +62,101 @@ class LoggingConfig:
         return logger
 
 
+@dataclass(frozen=True, slots=True)
 class AppConfig:
     """Application configuration container."""
     
-    def __init__(self):
-        """Initialize configuration from environment variables."""
-        
-        # Network configuration
-        self.switch_host = os.environ.get("SWITCH_HOST")
-        self.switch_username = os.environ.get("SWITCH_USERNAME")
-        self.switch_password = os.environ.get("SWITCH_PASSWORD")
-        self.switch_device_type = os.environ.get("SWITCH_DEVICE_TYPE", "cisco_ios")
-        self.switch_port = int(os.environ.get("SWITCH_PORT", "22"))
-        self.switch_timeout = int(os.environ.get("SWITCH_TIMEOUT", "30"))
-        
-        # Security configuration
-        self.webhook_secret = os.environ.get("WEBHOOK_SECRET")
-        
-        # Server configuration
-        self.port = int(os.environ.get("PORT", "8080"))
-        
-        # Notification configuration
-        self.notification_endpoint = os.environ.get("NOTIFICATION_ENDPOINT")
-        self.notification_timeout = int(os.environ.get("NOTIFICATION_TIMEOUT", "30"))  # 30 seconds
-        
-        # Webhook log configuration
-        self.webhook_log_endpoint = os.environ.get("WEBHOOK_LOG_ENDPOINT")
-        self.webhook_log_timeout = int(os.environ.get("WEBHOOK_LOG_TIMEOUT", "30"))  # 30 seconds
-        
-        # Logging configuration
-        self.disable_healthz_logs = os.environ.get("DISABLE_HEALTHZ_LOGS", "true").lower() == "true"
+    # Network configuration
+    switch_host: Optional[str] = None
+    switch_username: Optional[str] = None
+    switch_password: Optional[str] = field(default=None, repr=False)
+    switch_device_type: str = "cisco_ios"
+    switch_port: int = 22
+    switch_timeout: int = 30
+    connection_pool_enabled: bool = True  # Keep the switch SSH session open between operations
+    connection_pool_idle_timeout: int = 300  # Seconds an unused session is kept open
+    connection_pool_max_age: int = 3600  # Seconds before a session is re-established
+    connection_pool_max_size: int = 1  # Switch sessions open at the same time
+    connection_pool_keepalive_interval: int = 0  # Seconds between keepalives on idle sessions; 0 disables
+    switch_save_debounce_sec: float = 0  # Seconds to coalesce configuration saves over; 0 saves every change
+    switch_batch_window_sec: float = 0  # Seconds to collect concurrent port configurations into one config set; 0 disables
+    switch_batch_max_size: int = 16  # Port configurations committed without waiting for the window to end
+    switch_async_processing: bool = False  # Acknowledge webhooks with 202 and configure the switch afterwards
+    
+    # Security configuration
+    webhook_secret: Optional[str] = field(default=None, repr=False)
+    
+    # Deduplication configuration
+    event_dedup_ttl: int = 86400  # 24 hours
+    event_dedup_max_entries: int = 4096
+    redis_url: Optional[str] = None  # Shared dedup store for multi-worker deployments
+    
+    # Server configuration
+    port: int = 8080
+    
+    # Notification configuration
+    notification_endpoint: Optional[str] = None
+    notification_timeout: int = 30  # 30 seconds
+    notification_workers: int = 2  # Threads delivering notifications and webhook logs
+    notification_queue_size: int = 1000  # Pending notifications before the oldest is dropped
+    
+    # Webhook log configuration
+    webhook_log_endpoint: Optional[str] = None
+    webhook_log_timeout: int = 30  # 30 seconds
+    webhook_log_batch_size: int = 1  # Logs per POST to {endpoint}/batch; 1 sends them one by one
+    webhook_log_batch_interval: float = 1.0  # Seconds before a partial batch is sent
+    webhook_content_type: str = "json"  # Body encoding of notifications and webhook logs: json or cbor
+    
+    # Logging configuration
+    disable_healthz_logs: bool = True
+    
+    default_vlan_id: str = "100"  # Default VLAN ID if not specified
+    
+    @classmethod
+    def from_env(cls) -> "AppConfig":
+        """
+        Build the configuration from environment variables.
         
-        self.default_vlan_id = os.environ.get("DEFAULT_VLAN_ID", "100")  # Default VLAN ID if not specified
+        Returns:
+            Validated configuration instance
+        """
+        env = os.environ
+        app_config = cls(
+            switch_host=env.get("SWITCH_HOST"),
+            switch_username=env.get("SWITCH_USERNAME"),
+            switch_password=env.get("SWITCH_PASSWORD"),
+            switch_device_type=env.get("SWITCH_DEVICE_TYPE", "cisco_ios"),
+            switch_port=int(env.get("SWITCH_PORT", "22")),
+            switch_timeout=int(env.get("SWITCH_TIMEOUT", "30")),
+            connection_pool_enabled=env.get("CONNECTION_POOL_ENABLED", "true").lower() == "true",
+            connection_pool_idle_timeout=int(env.get("CONNECTION_POOL_IDLE_TIMEOUT", "300")),
+            connection_pool_max_age=int(env.get("CONNECTION_POOL_MAX_AGE", "3600")),
+            connection_pool_max_size=int(env.get("CONNECTION_POOL_MAX_SIZE", "1")),
+            connection_pool_keepalive_interval=int(env.get("CONNECTION_POOL_KEEPALIVE_INTERVAL", "0")),
+            switch_save_debounce_sec=float(env.get("SWITCH_SAVE_DEBOUNCE_SEC", "0")),
+            switch_batch_window_sec=float(env.get("SWITCH_BATCH_WINDOW_SEC", "0")),
+            switch_batch_max_size=int(env.get("SWITCH_BATCH_MAX_SIZE", "16")),
+            switch_async_processing=env.get("SWITCH_ASYNC_PROCESSING", "false").lower() == "true",
+            webhook_secret=env.get("WEBHOOK_SECRET"),
+            event_dedup_ttl=int(env.get("EVENT_DEDUP_TTL", "86400")),
+            event_dedup_max_entries=int(env.get("EVENT_DEDUP_MAX_ENTRIES", "4096")),
+            redis_url=env.get("REDIS_URL"),
+            port=int(env.get("PORT", "8080")),
+            notification_endpoint=env.get("NOTIFICATION_ENDPOINT"),
+            notification_timeout=int(env.get("NOTIFICATION_TIMEOUT", "30")),
+            notification_workers=int(env.get("NOTIFICATION_WORKERS", "2")),
+            notification_queue_size=int(env.get("NOTIFICATION_QUEUE_SIZE", "1000")),
+            webhook_log_endpoint=env.get("WEBHOOK_LOG_ENDPOINT"),
+            webhook_log_timeout=int(env.get("WEBHOOK_LOG_TIMEOUT", "30")),
+            webhook_log_batch_size=int(env.get("WEBHOOK_LOG_BATCH_SIZE", "1")),
+            webhook_log_batch_interval=float(env.get("WEBHOOK_LOG_BATCH_INTERVAL", "1.0")),
+            webhook_content_type=env.get("WEBHOOK_CONTENT_TYPE", "json").lower(),
+            disable_healthz_logs=env.get("DISABLE_HEALTHZ_LOGS", "true").lower() == "true",
+            default_vlan_id=env.get("DEFAULT_VLAN_ID", "100"),
+        )
         # Validate required configuration
-        self._validate_config()
+        app_config._validate_config()
+        return app_config
     
     def _validate_config(self) -> None:
         """Validate configuration values."""
@@ -101,6 +169,17 @@ class AppConfig:
         if not self.webhook_log_endpoint:
             logger.warning("WEBHOOK_LOG_ENDPOINT not configured. Webhook logging will be skipped.")
         
+        if self.webhook_content_type not in ("json", "cbor"):
+            raise ConfigurationError(
+                f"WEBHOOK_CONTENT_TYPE must be 'json' or 'cbor', got '{self.webhook_content_type}'."
+            )
+        
+        if self.webhook_content_type == "cbor" and importlib.util.find_spec("cbor2") is None:
+            raise ConfigurationError("WEBHOOK_CONTENT_TYPE 'cbor' requires the cbor2 package.")
+        
+        if self.redis_url and importlib.util.find_spec("redis") is None:
+            raise ConfigurationError("REDIS_URL requires the redis package.")
+        
         # Validate switch configuration
         if not self.switch_host:
             logger.warning("SWITCH_HOST not configured. Switch operations will fail.")
@@ -114,7 +193,7 @@ class AppConfig:
 
 # Initialize configuration
 logger = LoggingConfig.setup_logger("switch_port_webhook_client")
-config = AppConfig()
+config = AppConfig.from_env()
 
 # Configure uvicorn access logger to filter out healthz requests if enabled
 if config.disable_healthz_logs:
@@ -130,9 +209,26 @@ SWITCH_PASSWORD = config.switch_password
 SWITCH_DEVICE_TYPE = config.switch_device_type
 SWITCH_PORT = config.switch_port
 SWITCH_TIMEOUT = config.switch_timeout
+CONNECTION_POOL_ENABLED = config.connection_pool_enabled
+CONNECTION_POOL_IDLE_TIMEOUT = config.connection_pool_idle_timeout
+CONNECTION_POOL_MAX_AGE = config.connection_pool_max_age
+CONNECTION_POOL_MAX_SIZE = config.connection_pool_max_size
+CONNECTION_POOL_KEEPALIVE_INTERVAL = config.connection_pool_keepalive_interval
+SWITCH_SAVE_DEBOUNCE_SEC = config.switch_save_debounce_sec
+SWITCH_BATCH_WINDOW_SEC = config.switch_batch_window_sec
+SWITCH_BATCH_MAX_SIZE = config.switch_batch_max_size
+SWITCH_ASYNC_PROCESSING = config.switch_async_processing
 DEFAULT_VLAN_ID = config.default_vlan_id
 DISABLE_HEALTHZ_LOGS = config.disable_healthz_logs
 NOTIFICATION_ENDPOINT = config.notification_endpoint
 NOTIFICATION_TIMEOUT = config.notification_timeout
+NOTIFICATION_WORKERS = config.notification_workers
+NOTIFICATION_QUEUE_SIZE = config.notification_queue_size
 WEBHOOK_LOG_ENDPOINT = config.webhook_log_endpoint
 WEBHOOK_LOG_TIMEOUT = config.webhook_log_timeout
+WEBHOOK_LOG_BATCH_SIZE = config.webhook_log_batch_size
+WEBHOOK_LOG_BATCH_INTERVAL = config.webhook_log_batch_interval
+WEBHOOK_CONTENT_TYPE = config.webhook_content_type
+EVENT_DEDUP_TTL = config.event_dedup_ttl
+EVENT_DEDUP_MAX_ENTRIES = config.event_dedup_max_entries
+REDIS_URL = config.redis_url
@@ -4,11 +4,26 @@ Main application entry point.
 This module sets up the FastAPI application and configures the server
 for handling webhook events related to resource reservation management.
 """
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+
 import uvicorn
 from fastapi import FastAPI
 
 from . import config
-from .api import router
+from .api import WEBHOOK_SCHEMA_COMPONENTS, health_check, router, wait_for_background_tasks
+from .services import notification, switch
+from .utils import ORJSONResponse
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Finish acknowledged switch work, deliver pending notifications and close the switch connection on shutdown."""
+    yield
+    await wait_for_background_tasks()
+    await asyncio.to_thread(notification.shutdown, config.NOTIFICATION_TIMEOUT)
+    await asyncio.to_thread(switch.close_switch_connection)
 
 
 def create_app() -> FastAPI:
@@ -25,11 +40,28 @@ def create_app() -> FastAPI:
         docs_url="/docs",
         redoc_url="/redoc",
         openapi_url="/openapi.json",
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan,
     )
     
+    # Serve the health probe as a plain route, ahead of the FastAPI router
+    app.add_route("/healthz", health_check, methods=["GET"], include_in_schema=False)
+    
     # Add router to the FastAPI application
     app.include_router(router)
     
+    # Publish the webhook payload models referenced by the request body schema
+    generate_openapi = app.openapi
+    
+    def openapi() -> Dict[str, Any]:
+        """Generate the OpenAPI document once, adding the webhook payload models."""
+        if app.openapi_schema is None:
+            schema = generate_openapi()
+            schema.setdefault("components", {}).setdefault("schemas", {}).update(WEBHOOK_SCHEMA_COMPONENTS)
+        return app.openapi_schema
+    
+    app.openapi = openapi
+    
     return app
 
 
@@ -39,17 +71,13 @@ app = create_app()
 
 def main() -> None:
     """Run the application server."""
-    # Configure logging to filter healthz logs if enabled
-    if config.DISABLE_HEALTHZ_LOGS:
-        import logging
-        from .config import HealthzFilter
-        uvicorn_access_logger = logging.getLogger("uvicorn.access")
-        uvicorn_access_logger.addFilter(HealthzFilter())
-    
+    # The healthz access-log filter is installed when app.config is imported
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",  # Bind to all interfaces
         port=config.PORT,
+        loop="uvloop",
+        http="httptools",
         reload=False,
         log_level="info"
     )
@@ -4,9 +4,9 @@ Pydantic models for switch port webhook payload validation.
 This module defines the data models used for validating incoming webhook payloads.
 Only handles Switch Port resource types.
 """
-from typing import Optional
+from typing import Annotated, Any, Optional, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Discriminator, Field, Tag, TypeAdapter
 
 
 class WebhookPayload(BaseModel):
@@ -59,3 +59,39 @@ class EventWebhookPayload(BaseModel):
     timestamp: str = Field(..., description="Timestamp when the event occurred")
     webhook_id: str = Field(..., alias='webhookId', description="Unique identifier for the webhook")
     data: EventData = Field(..., description="Detailed data for the EVENT_DELETED event")
+
+
+def _payload_kind(value: Any) -> Optional[str]:
+    """
+    Pick the payload model from the raw webhook body.
+    
+    EVENT_DELETED payloads carry a nested "data" object; every other event
+    uses the flat single-event format.
+    
+    Args:
+        value: Decoded JSON body or model instance
+        
+    Returns:
+        Tag of the matching model, or None if it cannot be determined
+    """
+    if isinstance(value, dict):
+        if value.get("eventType") == "EVENT_DELETED" or "data" in value:
+            return "event"
+        return "single"
+    if isinstance(value, EventWebhookPayload):
+        return "event"
+    if isinstance(value, WebhookPayload):
+        return "single"
+    return None
+
+
+# Discriminated union of the supported payloads: exactly one model is validated per body
+AnyWebhookPayload = Annotated[
+    Union[
+        Annotated[WebhookPayload, Tag("single")],
+        Annotated[EventWebhookPayload, Tag("event")],
+    ],
+    Discriminator(_payload_kind, custom_error_type="dict_type"),
+]
+
+webhook_payload_adapter: TypeAdapter = TypeAdapter(AnyWebhookPayload)
@@ -0,0 +1,256 @@
+"""
+Idempotency service for webhook event deduplication.
+
+This module keeps track of recently processed webhook events so that
+duplicate deliveries (sender retries) can be acknowledged immediately
+without re-running the switch configuration pipeline. The response of a
+successfully processed event is kept alongside its key, so duplicates can
+be answered with the original response. When REDIS_URL is
+configured the processed keys are stored in Redis, so duplicates are
+detected across all server workers; if Redis cannot be reached, events are
+processed without deduplication.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+from .. import config
+
+logger = config.logger
+
+
+class EventDeduplicator:
+    """In-memory TTL cache of processed webhook event keys."""
+    
+    def __init__(self, ttl: Optional[int] = None, maxsize: Optional[int] = None):
+        """
+        Initialize the deduplicator.
+        
+        Args:
+            ttl: Seconds an event key is remembered. If None, uses config.EVENT_DEDUP_TTL
+            maxsize: Maximum number of remembered keys. If None, uses config.EVENT_DEDUP_MAX_ENTRIES
+        """
+        self.ttl = ttl if ttl is not None else config.EVENT_DEDUP_TTL
+        self.maxsize = maxsize if maxsize is not None else config.EVENT_DEDUP_MAX_ENTRIES
+        # key -> (claim time, stored response body)
+        self._seen: "OrderedDict[Hashable, Tuple[float, Optional[bytes]]]" = OrderedDict()
+        self._lock = asyncio.Lock()
+    
+    def _evict_expired(self, now: float) -> None:
+        """Drop keys older than the TTL (oldest entries are at the front)."""
+        cutoff = now - self.ttl
+        while self._seen:
+            _, (claimed_at, _) = next(iter(self._seen.items()))
+            if claimed_at >= cutoff:
+                break
+            self._seen.popitem(last=False)
+    
+    async def claim(self, key: Hashable) -> bool:
+        """
+        Claim an event key for processing.
+        
+        Args:
+            key: Unique key identifying the webhook event
+        
+        Returns:
+            True if the key was not seen before (caller should process the event),
+            False if it is a duplicate
+        """
+        async with self._lock:
+            now = time.monotonic()
+            self._evict_expired(now)
+            
+            if key in self._seen:
+                return False
+            
+            self._seen[key] = (now, None)
+            while len(self._seen) > self.maxsize:
+                self._seen.popitem(last=False)
+            return True
+    
+    async def release(self, key: Hashable) -> None:
+        """
+        Forget a claimed event key, e.g. when processing failed and a retry is expected.
+        
+        Args:
+            key: Unique key identifying the webhook event
+        """
+        async with self._lock:
+            self._seen.pop(key, None)
+    
+    async def store_response(self, key: Hashable, body: bytes) -> None:
+        """
+        Store the response body of a successfully processed event.
+        
+        Args:
+            key: Unique key identifying the webhook event
+            body: Encoded JSON response body
+        """
+        async with self._lock:
+            entry = self._seen.get(key)
+            if entry is not None:
+                self._seen[key] = (entry[0], body)
+    
+    async def get_response(self, key: Hashable) -> Optional[bytes]:
+        """
+        Get the stored response body of a processed event.
+        
+        Args:
+            key: Unique key identifying the webhook event
+        
+        Returns:
+            Encoded JSON response body, or None if the event is unknown or still in progress
+        """
+        async with self._lock:
+            entry = self._seen.get(key)
+            return entry[1] if entry is not None else None
+
+
+class RedisEventDeduplicator:
+    """
+    Redis-backed store of processed webhook event keys, shared across workers.
+    
+    Redis errors are logged and fail open: events are processed as if they were
+    new, so an outage of the store does not stop switch configuration.
+    """
+    
+    KEY_PREFIX = "whk"
+    IN_PROGRESS = b"1"
+    
+    def __init__(self, url: str, ttl: Optional[int] = None):
+        """
+        Initialize the deduplicator.
+        
+        Args:
+            url: Redis connection URL
+            ttl: Seconds an event key is remembered. If None, uses config.EVENT_DEDUP_TTL
+        """
+        import redis.asyncio as redis_asyncio
+        from redis.exceptions import RedisError
+        
+        self.ttl = ttl if ttl is not None else config.EVENT_DEDUP_TTL
+        self._redis = redis_asyncio.Redis.from_url(url)
+        self._redis_error = RedisError
+    
+    def _redis_key(self, key: Hashable) -> str:
+        """Build the Redis key for an event key."""
+        parts = key if isinstance(key, tuple) else (key,)
+        return ":".join([self.KEY_PREFIX, *map(str, parts)])
+    
+    async def claim(self, key: Hashable) -> bool:
+        """
+        Claim an event key for processing.
+        
+        Args:
+            key: Unique key identifying the webhook event
+        
+        Returns:
+            True if the key was not seen before (caller should process the event),
+            False if it is a duplicate
+        """
+        try:
+            claimed = await self._redis.set(self._redis_key(key), self.IN_PROGRESS, nx=True, ex=self.ttl)
+        except self._redis_error as e:
+            logger.warning("Redis unavailable, processing event %s without deduplication: %s", key, e)
+            return True
+        return bool(claimed)
+    
+    async def release(self, key: Hashable) -> None:
+        """
+        Forget a claimed event key, e.g. when processing failed and a retry is expected.
+        
+        Args:
+            key: Unique key identifying the webhook event
+        """
+        try:
+            await self._redis.delete(self._redis_key(key))
+        except self._redis_error as e:
+            logger.warning("Redis unavailable, could not release event %s: %s", key, e)
+    
+    async def store_response(self, key: Hashable, body: bytes) -> None:
+        """
+        Store the response body of a successfully processed event.
+        
+        Args:
+            key: Unique key identifying the webhook event
+            body: Encoded JSON response body
+        """
+        try:
+            await self._redis.set(self._redis_key(key), body, xx=True, keepttl=True)
+        except self._redis_error as e:
+            logger.warning("Redis unavailable, could not store the response of event %s: %s", key, e)
+    
+    async def get_response(self, key: Hashable) -> Optional[bytes]:
+        """
+        Get the stored response body of a processed event.
+        
+        Args:
+            key: Unique key identifying the webhook event
+        
+        Returns:
+            Encoded JSON response body, or None if the event is unknown or still in progress
+        """
+        try:
+            body = await self._redis.get(self._redis_key(key))
+        except self._redis_error as e:
+            logger.warning("Redis unavailable, could not read the response of event %s: %s", key, e)
+            return None
+        if body is None or body == self.IN_PROGRESS:
+            return None
+        return body
+
+
+# Singleton instance
+if config.REDIS_URL:
+    logger.info("Using Redis for webhook event deduplication.")
+    _event_deduplicator = RedisEventDeduplicator(config.REDIS_URL)
+else:
+    _event_deduplicator = EventDeduplicator()
+
+
+async def claim_event(key: Hashable) -> bool:
+    """
+    Claim an event key for processing (convenience function).
+    
+    Args:
+        key: Unique key identifying the webhook event
+    
+    Returns:
+        True if the event should be processed, False if it is a duplicate
+    """
+    return await _event_deduplicator.claim(key)
+
+
+async def release_event(key: Hashable) -> None:
+    """
+    Release a previously claimed event key (convenience function).
+    
+    Args:
+        key: Unique key identifying the webhook event
+    """
+    await _event_deduplicator.release(key)
+
+
+async def store_response(key: Hashable, body: bytes) -> None:
+    """
+    Store the response body of a processed event (convenience function).
+    
+    Args:
+        key: Unique key identifying the webhook event
+        body: Encoded JSON response body
+    """
+    await _event_deduplicator.store_response(key, body)
+
+
+async def get_response(key: Hashable) -> Optional[bytes]:
+    """
+    Get the stored response body of a processed event (convenience function).
+    
+    Args:
+        key: Unique key identifying the webhook event
+    
+    Returns:
+        Encoded JSON response body, or None if not available
+    """
+    return await _event_deduplicator.get_response(key)
@@ -4,43 +4,405 @@ Notification service for sending status updates via webhooks.
 This module provides functionality to send notifications about
 switch port configuration status to external endpoints.
 """
-import json
-from typing import Dict, Optional, Any
+import atexit
+import functools
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from datetime import timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from .. import config
 from .security import WebhookSecurity
 
 logger = config.logger
 
+# Constants for notification message and event types
+_TYPE_INFO = "INFO"
+_TYPE_SUCCESS = "SUCCESS"
+_TYPE_WARNING = "WARNING"
+_TYPE_ERROR = "ERROR"
+_EVENT_SWITCH_PORT_CONFIG = "SWITCH_PORT_CONFIG"
+_EVENT_VLAN_CONFLICT = "VLAN_CONFLICT"
 
-class NotificationError(Exception):
-    """Custom exception for notification operations."""
-    pass
+# Switch port notification message and type, keyed by (is_reservation_end, success)
+_MSG_TEMPLATES = {
+    (False, True): ("Switch port '{name}' configured successfully", _TYPE_SUCCESS),
+    (False, False): ("Failed to configure switch port '{name}'", _TYPE_ERROR),
+    (True, True): ("Switch port reservation for '{name}' has ended", _TYPE_INFO),
+    (True, False): ("Switch port reservation for '{name}' ended with errors", _TYPE_WARNING),
+}
+
+# Field limits of the receiver DTOs; longer values are cut and end with an ellipsis
+_ELLIPSIS = "..."
+_MESSAGE_MAX = 500
+_MESSAGE_TYPE_MAX = 50
+_LOG_TEXT_MAX = 4000
+
+
+class _RateLimit:
+    """Token bucket allowing about `rate` events per second, with bursts of the same size."""
+    
+    __slots__ = ("rate", "_tokens", "_last")
+    
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._tokens = rate
+        self._last = time.monotonic()
+    
+    def allow(self) -> bool:
+        """
+        Consume a token if one is available.
+        
+        Returns:
+            True if the event may proceed, False if it should be dropped
+        """
+        # Unlocked: concurrent callers can only let a few extra events through
+        now = time.monotonic()
+        self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+# Per-send INFO lines are sampled so that notification bursts do not flood the logs
+_SEND_LOG_LIMIT = _RateLimit(10)
+
+
+@functools.lru_cache(maxsize=256)
+def _vlan_conflict_message(resource_name: str, vlan_id: str, interfaces: Tuple[str, ...]) -> str:
+    """
+    Build the VLAN conflict message, cached for conflicts reported repeatedly.
+    
+    Args:
+        resource_name: Name of the switch port resource
+        vlan_id: Requested VLAN ID
+        interfaces: Interfaces already using the VLAN
+        
+    Returns:
+        Notification message
+    """
+    return (
+        f"VLAN ID '{vlan_id}' requested for switch port '{resource_name}' "
+        f"is already in use by interfaces: {', '.join(interfaces)}"
+    )
+
+
+def _truncate(text: Optional[str], limit: int) -> Optional[str]:
+    """
+    Cut a value to a field limit, marking the cut with an ellipsis.
+    
+    Args:
+        text: Value to truncate, or None
+        limit: Maximum length of the result
+        
+    Returns:
+        The value itself when it fits, otherwise its truncated copy
+    """
+    if text is None or len(text) <= limit:
+        return text
+    return f"{text[:limit - len(_ELLIPSIS)]}{_ELLIPSIS}"
+
+# Metadata may hold datetime, UUID, dataclass and numpy values, which orjson
+# encodes natively; naive datetimes are treated as UTC and written with a 'Z'
+_JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
+
+# Outbound payloads are slotted dataclasses. Field names follow the receiver's
+# DTOs, so they are camelCase like the JSON keys.
+@dataclass(slots=True)
+class NotificationPayload:
+    """Notification payload following WebhookNotificationRequestDTO structure."""
+    
+    webhookId: int
+    userId: str
+    message: str
+    type: str = _TYPE_INFO
+    eventId: Optional[str] = None
+    resourceId: Optional[str] = None
+    eventType: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+
+@dataclass(slots=True)
+class WebhookLogPayload:
+    """Webhook log payload following WebhookLogRequestDTO structure."""
+    
+    webhookId: int
+    eventType: str
+    payload: Union[str, Callable[[], str]]  # Callables are serialized when the log is encoded
+    success: bool
+    statusCode: Optional[int] = None
+    response: Optional[str] = None
+    retryCount: int = 0
+    resourceId: Optional[int] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+
+OutboundPayload = Union[NotificationPayload, WebhookLogPayload, List[WebhookLogPayload]]
+
+
+def _compact(payload: OutboundPayload) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Convert an outbound payload to its wire form, leaving out unset fields.
+    
+    Lazily produced field values are resolved here, on the delivery thread.
+    
+    Args:
+        payload: Payload or batch of payloads
+        
+    Returns:
+        Dictionary, or list of dictionaries, without None-valued keys
+    """
+    if isinstance(payload, list):
+        return [_compact(item) for item in payload]
+    return {
+        name: value() if callable(value) else value
+        for name in payload.__slots__
+        if (value := getattr(payload, name)) is not None
+    }
 
 
 class NotificationService:
     """Service for sending notifications to external endpoints."""
     
     def __init__(self):
+        # Endpoints and limits are read once; changing them requires a new service instance
+        self._endpoint = config.NOTIFICATION_ENDPOINT
+        self._timeout = config.NOTIFICATION_TIMEOUT
+        self._log_endpoint = config.WEBHOOK_LOG_ENDPOINT
+        self._log_timeout = config.WEBHOOK_LOG_TIMEOUT
+        self._log_batch_size = config.WEBHOOK_LOG_BATCH_SIZE
+        self._log_batch_interval = config.WEBHOOK_LOG_BATCH_INTERVAL
+        self._log_batch_endpoint = f"{self._log_endpoint.rstrip('/')}/batch" if self._log_endpoint else None
+        
         self.security = WebhookSecurity()
+        # Resolved once: requests are only signed when a webhook secret is configured
+        self._sign: Optional[Callable[[bytes], str]] = self.security.sign if config.WEBHOOK_SECRET else None
         self.session = requests.Session()
         
         # Set default timeout for all requests
-        self.session.timeout = config.NOTIFICATION_TIMEOUT
+        self.session.timeout = self._timeout
+        
+        # Request body encoding, resolved once; CBOR is opt-in and needs the cbor2 package
+        if config.WEBHOOK_CONTENT_TYPE == "cbor":
+            import cbor2
+            self._cbor_dumps = cbor2.dumps
+            self._encode: Callable[[OutboundPayload], bytes] = self._encode_cbor
+            content_type = "application/cbor"
+        else:
+            self._encode = self._encode_json
+            content_type = "application/json"
+        
+        # Headers shared by every request; only the signature varies per payload
+        self.session.headers.update({
+            "Content-Type": content_type,
+            "User-Agent": "switch-port-webhook/1.0",
+            "Connection": "keep-alive"
+        })
+        
+        # Outbound requests are delivered by background workers so that event
+        # handlers do not wait on notification round-trips. The workers share
+        # the session, keeping the connections to the endpoints alive, and
+        # deliver notifications and webhook logs concurrently.
+        self.worker_count = max(1, config.NOTIFICATION_WORKERS)
+        # Transient gateway errors and connection failures are retried with backoff
+        retries = Retry(
+            total=3,
+            backoff_factor=0.2,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(["POST"])
+        )
+        adapter = HTTPAdapter(pool_maxsize=self.worker_count, max_retries=retries)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # Bounded so that a slow or unreachable endpoint cannot grow memory without limit
+        self._queue: "queue.Queue[Optional[Tuple[str, Any, int]]]" = queue.Queue(
+            maxsize=config.NOTIFICATION_QUEUE_SIZE
+        )
+        self._workers: List[threading.Thread] = []
+        self._worker_lock = threading.Lock()
+        
+        # Webhook logs waiting to be sent together to the batch endpoint
+        self._log_buffer: List[WebhookLogPayload] = []
+        self._log_lock = threading.Lock()
+        self._log_timer: Optional[threading.Timer] = None
+    
+    @staticmethod
+    def _encode_json(payload: OutboundPayload) -> bytes:
+        """Encode a request body as JSON."""
+        return orjson.dumps(_compact(payload), option=_JSON_OPTIONS)
+    
+    def _encode_cbor(self, payload: OutboundPayload) -> bytes:
+        """Encode a request body as CBOR, treating naive datetimes as UTC."""
+        return self._cbor_dumps(_compact(payload), timezone=timezone.utc)
+    
+    def _ensure_workers(self) -> None:
+        """Start the background delivery threads if they are not running."""
+        if self._workers and all(worker.is_alive() for worker in self._workers):
+            return
+        
+        with self._worker_lock:
+            self._workers = [worker for worker in self._workers if worker.is_alive()]
+            for index in range(len(self._workers), self.worker_count):
+                worker = threading.Thread(
+                    target=self._run_worker,
+                    name=f"notification-worker-{index}",
+                    daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+    
+    def _run_worker(self) -> None:
+        """Deliver queued requests until a shutdown sentinel is received."""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                endpoint, payload, timeout = item
+                self._send_request(endpoint, payload, timeout)
+            finally:
+                self._queue.task_done()
+    
+    def _enqueue(self, endpoint: str, payload: OutboundPayload, timeout: int) -> bool:
+        """
+        Queue a request for background delivery.
+        
+        When the queue is full the oldest pending request is dropped, so the most
+        recent notifications are the ones delivered.
+        
+        Args:
+            endpoint: Target endpoint URL
+            payload: Request payload
+            timeout: Request timeout in seconds
+            
+        Returns:
+            True once the request has been queued
+        """
+        self._ensure_workers()
+        item = (endpoint, payload, timeout)
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return True
+            except queue.Full:
+                pass
+            
+            try:
+                dropped = self._queue.get_nowait()
+            except queue.Empty:
+                continue
+            self._queue.task_done()
+            if dropped is None:
+                # Keep shutdown sentinels; the worker still needs them
+                self._queue.put(dropped)
+                continue
+            logger.warning("Notification queue is full, dropped oldest request to %s", dropped[0])
+    
+    def _dispatch(self, endpoint: str, payload: OutboundPayload, timeout: int, wait: bool) -> bool:
+        """
+        Send a request now or queue it for background delivery.
+        
+        Args:
+            endpoint: Target endpoint URL
+            payload: Request payload
+            timeout: Request timeout in seconds
+            wait: Send synchronously on the calling thread
+            
+        Returns:
+            Delivery result when wait is set, otherwise whether the request was queued
+        """
+        if wait:
+            return self._send_request(endpoint, payload, timeout)
+        return self._enqueue(endpoint, payload, timeout)
+    
+    def _buffer_webhook_log(self, payload: WebhookLogPayload) -> bool:
+        """
+        Add a webhook log to the pending batch, queueing the batch once it is full.
+        
+        Args:
+            payload: Webhook log payload
+            
+        Returns:
+            True once the log has been buffered or queued
+        """
+        with self._log_lock:
+            self._log_buffer.append(payload)
+            if len(self._log_buffer) < self._log_batch_size:
+                if self._log_timer is None:
+                    self._log_timer = threading.Timer(self._log_batch_interval, self._flush_webhook_logs)
+                    self._log_timer.daemon = True
+                    self._log_timer.start()
+                return True
+        
+        return self._flush_webhook_logs()
+    
+    def _flush_webhook_logs(self) -> bool:
+        """
+        Queue the pending webhook logs as a single request to the batch endpoint.
+        
+        Returns:
+            True if the batch was queued or there was nothing to send
+        """
+        with self._log_lock:
+            batch, self._log_buffer = self._log_buffer, []
+            if self._log_timer is not None:
+                self._log_timer.cancel()
+                self._log_timer = None
+        
+        if not batch:
+            return True
+        
+        return self._enqueue(self._log_batch_endpoint, batch, self._log_timeout)
+    
+    def flush(self) -> None:
+        """Block until every buffered and queued request has been delivered."""
+        self._flush_webhook_logs()
+        self._queue.join()
+    
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """
+        Deliver pending requests, stop the background workers and close the session.
+        
+        Args:
+            timeout: Maximum seconds to wait for the workers to finish
+        """
+        self._flush_webhook_logs()
+        
+        with self._worker_lock:
+            workers = [worker for worker in self._workers if worker.is_alive()]
+            self._workers = []
+        
+        for _ in workers:
+            self._queue.put(None)
+        
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for worker in workers:
+            worker.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        
+        self.session.close()
     
     def _create_notification_payload(
         self,
         webhook_id: int,
         user_id: str,
         message: str,
-        message_type: str = "INFO",
+        message_type: str = _TYPE_INFO,
         event_id: Optional[str] = None,
         resource_id: Optional[str] = None,
         event_type: Optional[str] = None,
         metadata: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, Any]:
+    ) -> NotificationPayload:
         """
         Create notification payload following WebhookNotificationRequestDTO structure.
         
@@ -55,48 +417,35 @@ class NotificationService:
             metadata: Additional metadata
             
         Returns:
-            Notification payload dictionary
+            Notification payload
         """
-        # Truncate message if too long
-        if len(message) > 500:
-            message = message[:497] + "..."
-            
-        # Truncate type if too long
-        if len(message_type) > 50:
-            message_type = message_type[:50]
-            
-        payload = {
-            "webhookId": webhook_id,
-            "userId": user_id,
-            "message": message,
-            "type": message_type,
-            "eventId": event_id,
-            "resourceId": resource_id,
-            "eventType": event_type,
-            "metadata": metadata
-        }
-            
-        return payload
+        # Truncate message and type if too long
+        message = _truncate(message, _MESSAGE_MAX)
+        message_type = message_type[:_MESSAGE_TYPE_MAX]
+        
+        return NotificationPayload(
+            webhook_id, user_id, message, message_type, event_id, resource_id, event_type, metadata
+        )
     
     def _create_webhook_log_payload(
         self,
         webhook_id: int,
         event_type: str,
-        payload_data: str,
+        payload_data: Union[str, Callable[[], str]],
         success: bool,
         status_code: Optional[int] = None,
         response: Optional[str] = None,
         retry_count: int = 0,
         resource_id: Optional[int] = None,
         metadata: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, Any]:
+    ) -> WebhookLogPayload:
         """
         Create webhook log payload following WebhookLogRequestDTO structure.
         
         Args:
             webhook_id: Webhook identifier
             event_type: Type of the webhook event
-            payload_data: Webhook payload (max 4000 chars)
+            payload_data: Webhook payload (max 4000 chars), or a callable producing it
             success: Whether the webhook processing was successful
             status_code: HTTP status code for the response
             response: Response message (max 4000 chars)
@@ -105,34 +454,24 @@ class NotificationService:
             metadata: Additional metadata
             
         Returns:
-            Webhook log payload dictionary
+            Webhook log payload
         """
-        # Truncate payload if too long
-        if len(payload_data) > 4000:
-            payload_data = payload_data[:3997] + "..."
-            
-        # Truncate response if too long
-        if response and len(response) > 4000:
-            response = response[:3997] + "..."
-            
-        payload = {
-            "webhookId": webhook_id,
-            "eventType": event_type,
-            "payload": payload_data,
-            "success": success,
-            "statusCode": status_code,
-            "response": response,
-            "retryCount": retry_count,
-            "resourceId": resource_id,
-            "metadata": metadata
-        }
-            
-        return payload
+        # Truncate payload and response if too long; a lazy payload is truncated once produced
+        if callable(payload_data):
+            produce_payload = payload_data
+            payload_data = lambda: _truncate(produce_payload(), _LOG_TEXT_MAX)
+        else:
+            payload_data = _truncate(payload_data, _LOG_TEXT_MAX)
+        response = _truncate(response, _LOG_TEXT_MAX)
+        
+        return WebhookLogPayload(
+            webhook_id, event_type, payload_data, success, status_code, response, retry_count, resource_id, metadata
+        )
     
     def _send_request(
         self,
         endpoint: str,
-        payload: Dict[str, Any],
+        payload: OutboundPayload,
         timeout: int
     ) -> bool:
         """
@@ -147,23 +486,15 @@ class NotificationService:
             True if successful, False otherwise
         """
         try:
-            # Convert payload to JSON bytes for signature generation
-            payload_json = json.dumps(payload, separators=(',', ':'))  # Compact JSON
-            payload_bytes = payload_json.encode('utf-8')
-            
-            headers = {
-                "Content-Type": "application/json",
-                "User-Agent": "switch-port-webhook/1.0"
-            }
+            # Encode the payload once; the signature covers exactly the bytes sent
+            payload_bytes = self._encode(payload)
             
-            # Add signature if webhook secret is configured
-            if config.WEBHOOK_SECRET:
-                signature = self.security._generate_signature(payload_bytes)
-                headers["X-Webhook-Signature"] = signature
-                logger.debug(f"Generated signature for payload: {signature}")
+            # Content-Type and User-Agent come from the session; only the signature is per request
+            headers = None if self._sign is None else {"X-Webhook-Signature": self._sign(payload_bytes)}
             
-            logger.debug(f"Sending request to {endpoint} with payload: {payload}")
-            logger.debug(f"Request headers: {headers}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Sending request to %s with payload: %s", endpoint, payload)
+                logger.debug("Request headers: %s", headers)
             
             response = self.session.post(
                 endpoint,
@@ -173,14 +504,14 @@ class NotificationService:
             )
             
             response.raise_for_status()
-            logger.debug(f"Successfully sent request to {endpoint}: {response.status_code}")
+            logger.debug("Successfully sent request to %s: %s", endpoint, response.status_code)
             return True
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"Error sending request to {endpoint}: {str(e)}")
+            logger.error("Error sending request to %s: %s", endpoint, e)
             return False
         except Exception as e:
-            logger.error(f"Unexpected error sending request to {endpoint}: {str(e)}")
+            logger.error("Unexpected error sending request to %s: %s", endpoint, e)
             return False
     
     def send_switch_port_notification(
@@ -192,7 +523,8 @@ class NotificationService:
         error_message: Optional[str] = None,
         event_id: Optional[str] = None,
         resource_id: Optional[str] = None,
-        is_reservation_end: bool = False
+        is_reservation_end: bool = False,
+        wait: bool = False
     ) -> bool:
         """
         Send switch port configuration notification.
@@ -206,33 +538,20 @@ class NotificationService:
             event_id: Event identifier
             resource_id: Resource identifier
             is_reservation_end: Whether this is a reservation end notification
+            wait: Send synchronously and report the delivery result instead of queueing
             
         Returns:
-            True if notification was sent successfully, False otherwise
+            True if the notification was queued, sent or skipped, False if sending failed
         """
-        if not config.NOTIFICATION_ENDPOINT:
+        if not self._endpoint:
             logger.debug("No notification endpoint configured, skipping notification")
             return True
         
         # Create message based on success status and reservation state
-        if is_reservation_end:
-            if success:
-                message = f"Switch port reservation for '{resource_name}' has ended"
-                message_type = "INFO"
-            else:
-                message = f"Switch port reservation for '{resource_name}' ended with errors"
-                if error_message:
-                    message += f": {error_message}"
-                message_type = "WARNING"
-        else:
-            if success:
-                message = f"Switch port '{resource_name}' configured successfully"
-                message_type = "SUCCESS"
-            else:
-                message = f"Failed to configure switch port '{resource_name}'"
-                if error_message:
-                    message += f": {error_message}"
-                message_type = "ERROR"
+        template, message_type = _MSG_TEMPLATES[(is_reservation_end, success)]
+        message = template.format(name=resource_name)
+        if not success and error_message:
+            message = f"{message}: {error_message}"
         
         payload = self._create_notification_payload(
             webhook_id=webhook_id,
@@ -241,12 +560,13 @@ class NotificationService:
             message_type=message_type,
             event_id=event_id,
             resource_id=resource_id,
-            event_type="SWITCH_PORT_CONFIG",
+            event_type=_EVENT_SWITCH_PORT_CONFIG,
             metadata={"resourceName": resource_name}
         )
         
-        logger.info(f"Sending switch port notification for resource '{resource_name}' (success: {success})")
-        return self._send_request(config.NOTIFICATION_ENDPOINT, payload, config.NOTIFICATION_TIMEOUT)
+        if _SEND_LOG_LIMIT.allow():
+            logger.info("Sending switch port notification for resource '%s' (success: %s)", resource_name, success)
+        return self._dispatch(self._endpoint, payload, self._timeout, wait)
     
     def send_vlan_conflict_notification(
         self,
@@ -256,7 +576,8 @@ class NotificationService:
         vlan_id: str,
         conflicting_interfaces: list,
         event_id: Optional[str] = None,
-        resource_id: Optional[str] = None
+        resource_id: Optional[str] = None,
+        wait: bool = False
     ) -> bool:
         """
         Send notification about VLAN conflicts.
@@ -269,26 +590,26 @@ class NotificationService:
             conflicting_interfaces: List of interfaces already using the VLAN
             event_id: Event identifier
             resource_id: Resource identifier
+            wait: Send synchronously and report the delivery result instead of queueing
             
         Returns:
-            True if notification was sent successfully, False otherwise
+            True if the notification was queued, sent or skipped, False if sending failed
         """
-        if not config.NOTIFICATION_ENDPOINT:
+        if not self._endpoint:
             logger.debug("No notification endpoint configured, skipping VLAN conflict notification")
             return True
         
         # Create message with conflict details
-        interfaces_str = ", ".join(conflicting_interfaces)
-        message = f"VLAN ID '{vlan_id}' requested for switch port '{resource_name}' is already in use by interfaces: {interfaces_str}"
+        message = _vlan_conflict_message(resource_name, vlan_id, tuple(conflicting_interfaces))
         
         payload = self._create_notification_payload(
             webhook_id=webhook_id,
             user_id=user_id,
             message=message,
-            message_type="WARNING",
+            message_type=_TYPE_WARNING,
             event_id=event_id,
             resource_id=resource_id,
-            event_type="VLAN_CONFLICT",
+            event_type=_EVENT_VLAN_CONFLICT,
             metadata={
                 "resourceName": resource_name,
                 "vlanId": vlan_id,
@@ -296,20 +617,22 @@ class NotificationService:
             }
         )
         
-        logger.info(f"Sending VLAN conflict notification for resource '{resource_name}' and VLAN ID '{vlan_id}'")
-        return self._send_request(config.NOTIFICATION_ENDPOINT, payload, config.NOTIFICATION_TIMEOUT)
+        if _SEND_LOG_LIMIT.allow():
+            logger.info("Sending VLAN conflict notification for resource '%s' and VLAN ID '%s'", resource_name, vlan_id)
+        return self._dispatch(self._endpoint, payload, self._timeout, wait)
     
     def send_webhook_log(
         self,
         webhook_id: int,
         event_type: str,
         success: bool,
-        payload_data: str = "",
+        payload_data: Union[str, Callable[[], str]] = "",
         status_code: Optional[int] = None,
         response: Optional[str] = None,
         retry_count: int = 0,
         resource_id: Optional[int] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        wait: bool = False
     ) -> bool:
         """
         Send webhook event log.
@@ -318,17 +641,19 @@ class NotificationService:
             webhook_id: Webhook identifier
             event_type: Type of the webhook event
             success: Whether the webhook processing was successful
-            payload_data: Webhook payload data
+            payload_data: Webhook payload data, or a callable producing it. The callable
+                is only invoked when the log is actually sent
             status_code: HTTP status code for the response
             response: Response message
             retry_count: Number of retries attempted
             resource_id: Resource identifier
-            metadata: Additional metadata
+            metadata: Additional metadata; datetime, UUID and dataclass values are serialized as is
+            wait: Send synchronously and report the delivery result instead of queueing
             
         Returns:
-            True if log was sent successfully, False otherwise
+            True if the log was queued, sent or skipped, False if sending failed
         """
-        if not config.WEBHOOK_LOG_ENDPOINT:
+        if not self._log_endpoint:
             logger.debug("No webhook log endpoint configured, skipping webhook log")
             return True
         
@@ -344,12 +669,31 @@ class NotificationService:
             metadata=metadata
         )
         
-        logger.info(f"Sending webhook log for event '{event_type}' (success: {success})")
-        return self._send_request(config.WEBHOOK_LOG_ENDPOINT, payload, config.WEBHOOK_LOG_TIMEOUT)
+        if _SEND_LOG_LIMIT.allow():
+            logger.info("Sending webhook log for event '%s' (success: %s)", event_type, success)
+        if self._log_batch_size > 1 and not wait:
+            return self._buffer_webhook_log(payload)
+        return self._dispatch(self._log_endpoint, payload, self._log_timeout, wait)
 
 
-# Singleton instance
-_notification_service = NotificationService()
+# Singleton instance, created on first use
+_notification_service: Optional[NotificationService] = None
+_notification_service_lock = threading.Lock()
+
+
+def get_notification_service() -> NotificationService:
+    """
+    Get the global NotificationService instance.
+    
+    Returns:
+        NotificationService instance
+    """
+    global _notification_service
+    if _notification_service is None:
+        with _notification_service_lock:
+            if _notification_service is None:
+                _notification_service = NotificationService()
+    return _notification_service
 
 
 def send_switch_port_notification(
@@ -360,7 +704,8 @@ def send_switch_port_notification(
     error_message: Optional[str] = None,
     event_id: Optional[str] = None,
     resource_id: Optional[str] = None,
-    is_reservation_end: bool = False
+    is_reservation_end: bool = False,
+    wait: bool = False
 ) -> bool:
     """
     Send switch port notification (convenience function).
@@ -374,12 +719,16 @@ def send_switch_port_notification(
         event_id: Event identifier
         resource_id: Resource identifier
         is_reservation_end: Whether this is a reservation end notification
+        wait: Send synchronously and report the delivery result instead of queueing
         
     Returns:
-        True if notification was sent successfully, False otherwise
+        True if the notification was queued, sent or skipped, False if sending failed
     """
-    return _notification_service.send_switch_port_notification(
-        webhook_id, user_id, resource_name, success, error_message, event_id, resource_id, is_reservation_end
+    # Notifications disabled: skip creating the service altogether
+    if not config.NOTIFICATION_ENDPOINT:
+        return True
+    return get_notification_service().send_switch_port_notification(
+        webhook_id, user_id, resource_name, success, error_message, event_id, resource_id, is_reservation_end, wait
     )
 
 
@@ -390,7 +739,8 @@ def send_vlan_conflict_notification(
     vlan_id: str,
     conflicting_interfaces: list,
     event_id: Optional[str] = None,
-    resource_id: Optional[str] = None
+    resource_id: Optional[str] = None,
+    wait: bool = False
 ) -> bool:
     """
     Send VLAN conflict notification (convenience function).
@@ -403,12 +753,15 @@ def send_vlan_conflict_notification(
         conflicting_interfaces: List of interfaces already using the VLAN
         event_id: Event identifier
         resource_id: Resource identifier
+        wait: Send synchronously and report the delivery result instead of queueing
             
     Returns:
-        True if notification was sent successfully, False otherwise
+        True if the notification was queued, sent or skipped, False if sending failed
     """
-    return _notification_service.send_vlan_conflict_notification(
-        webhook_id, user_id, resource_name, vlan_id, conflicting_interfaces, event_id, resource_id
+    if not config.NOTIFICATION_ENDPOINT:
+        return True
+    return get_notification_service().send_vlan_conflict_notification(
+        webhook_id, user_id, resource_name, vlan_id, conflicting_interfaces, event_id, resource_id, wait
     )
 
 
@@ -416,12 +769,13 @@ def send_webhook_log(
     webhook_id: int,
     event_type: str,
     success: bool,
-    payload_data: str = "",
+    payload_data: Union[str, Callable[[], str]] = "",
     status_code: Optional[int] = None,
     response: Optional[str] = None,
     retry_count: int = 0,
     resource_id: Optional[int] = None,
-    metadata: Optional[Dict[str, Any]] = None
+    metadata: Optional[Dict[str, Any]] = None,
+    wait: bool = False
 ) -> bool:
     """
     Send webhook log (convenience function).
@@ -430,17 +784,42 @@ def send_webhook_log(
         webhook_id: Webhook identifier
         event_type: Type of the webhook event
         success: Whether the webhook processing was successful
-        payload_data: Webhook payload data
+        payload_data: Webhook payload data, or a callable producing it lazily
         status_code: HTTP status code for the response
         response: Response message
         retry_count: Number of retries attempted
         resource_id: Resource identifier
-        metadata: Additional metadata
+        metadata: Additional metadata; datetime, UUID and dataclass values are serialized as is
+        wait: Send synchronously and report the delivery result instead of queueing
         
     Returns:
-        True if log was sent successfully, False otherwise
+        True if the log was queued, sent or skipped, False if sending failed
     """
-    return _notification_service.send_webhook_log(
+    # Webhook logging disabled: skip creating the service and building the payload
+    if not config.WEBHOOK_LOG_ENDPOINT:
+        return True
+    return get_notification_service().send_webhook_log(
         webhook_id, event_type, success, payload_data, status_code, response,
-        retry_count, resource_id, metadata
+        retry_count, resource_id, metadata, wait
     )
+
+
+def flush() -> None:
+    """Block until every queued notification has been delivered (convenience function)."""
+    if _notification_service is not None:
+        _notification_service.flush()
+
+
+def shutdown(timeout: Optional[float] = None) -> None:
+    """
+    Deliver pending notifications and stop the background worker (convenience function).
+    
+    Args:
+        timeout: Maximum seconds to wait for pending notifications
+    """
+    if _notification_service is not None:
+        _notification_service.shutdown(timeout)
+
+
+# Deliver pending notifications when the interpreter exits without a lifespan shutdown
+atexit.register(shutdown, config.NOTIFICATION_TIMEOUT)
@@ -5,14 +5,19 @@ This module provides functionality to verify webhook signatures using HMAC-SHA25
 to ensure the authenticity and integrity of incoming webhook requests.
 """
 import base64
+import binascii
 import hashlib
 import hmac
+import logging
 from typing import Optional
 
 from .. import config
 
 logger = config.logger
 
+# Length of a base64-encoded HMAC-SHA256 digest (32 bytes, padded)
+_EXPECTED_SIGNATURE_LENGTH = 44
+
 
 class SignatureVerificationError(Exception):
     """Raised when signature verification fails."""
@@ -30,6 +35,45 @@ class WebhookSecurity:
             secret: Secret key for signature verification. If None, uses config.WEBHOOK_SECRET
         """
         self.secret = secret or config.WEBHOOK_SECRET
+        # Key the HMAC once; new_hmac() copies this template instead of re-deriving the key pads
+        self._hmac_template = (
+            hmac.new(self.secret.encode('utf-8'), digestmod=hashlib.sha256) if self.secret else None
+        )
+    
+    def new_hmac(self) -> hmac.HMAC:
+        """
+        Create a fresh HMAC-SHA256 object keyed with the webhook secret.
+        
+        The returned object can be fed incrementally via update(), which allows
+        computing the signature while the request body is being received.
+        
+        Returns:
+            Keyed HMAC object
+            
+        Raises:
+            SignatureVerificationError: If secret is not configured
+        """
+        if self._hmac_template is None:
+            raise SignatureVerificationError("Webhook secret not configured")
+        
+        return self._hmac_template.copy()
+    
+    def sign(self, payload: bytes) -> str:
+        """
+        Sign a payload with HMAC-SHA256.
+        
+        Args:
+            payload: Raw payload bytes
+            
+        Returns:
+            Base64-encoded signature string
+            
+        Raises:
+            SignatureVerificationError: If secret is not configured
+        """
+        hash_object = self.new_hmac()
+        hash_object.update(payload)
+        return binascii.b2a_base64(hash_object.digest(), newline=False).decode('ascii')
     
     def _generate_signature(self, payload: bytes) -> str:
         """
@@ -44,45 +88,63 @@ class WebhookSecurity:
         Raises:
             SignatureVerificationError: If secret is not configured
         """
-        if not self.secret:
-            raise SignatureVerificationError("Webhook secret not configured")
-        
-        hash_object = hmac.new(
-            self.secret.encode('utf-8'),
-            msg=payload,
-            digestmod=hashlib.sha256
-        )
-        return base64.b64encode(hash_object.digest()).decode('utf-8')
+        return self.sign(payload)
     
-    def verify_signature(self, payload: bytes, received_signature: Optional[str]) -> bool:
+    @staticmethod
+    def is_signature_well_formed(received_signature: Optional[str]) -> bool:
         """
-        Verify webhook signature against the payload.
+        Check that a signature header is present and has the length of a signature.
+        
+        The check does not depend on the secret, so it can reject malformed headers
+        before any HMAC is computed over the request body.
         
         Args:
-            payload: Raw payload bytes
             received_signature: Signature from the webhook header
             
         Returns:
-            True if signature is valid or no secret is configured, False otherwise
+            True if the header could hold a valid signature, False otherwise
         """
-        # Skip verification if no secret is configured
-        if not self.secret:
-            logger.warning("Webhook secret not configured. Skipping signature verification.")
-            return True
-        
-        # Check if signature header is present
         if not received_signature:
             logger.warning("Missing X-Webhook-Signature header.")
             return False
         
+        if len(received_signature) != _EXPECTED_SIGNATURE_LENGTH:
+            logger.warning("Signature verification failed: malformed signature length.")
+            return False
+        
+        return True
+    
+    def verify_hmac(self, mac: hmac.HMAC, received_signature: Optional[str]) -> bool:
+        """
+        Verify a webhook signature against an already-fed HMAC object.
+        
+        Args:
+            mac: HMAC object created by new_hmac() and updated with the payload
+            received_signature: Signature from the webhook header
+            
+        Returns:
+            True if signature is valid, False otherwise
+        """
+        # Check if signature header is present and well formed
+        if not self.is_signature_well_formed(received_signature):
+            return False
+        
         try:
-            expected_signature = self._generate_signature(payload)
+            # Compare raw digests: the header is decoded once instead of encoding ours
+            received_digest = base64.b64decode(received_signature, validate=True)
+        except (binascii.Error, ValueError):
+            logger.warning("Signature verification failed: malformed signature header.")
+            return False
+        
+        try:
+            expected_digest = mac.digest()
             
-            logger.debug(f"Received Signature: {received_signature}")
-            logger.debug(f"Expected Signature: {expected_signature}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Received Signature: %s", received_signature)
+                logger.debug("Expected Signature: %s", binascii.b2a_base64(expected_digest, newline=False).decode('ascii'))
             
             # Use constant-time comparison to prevent timing attacks
-            if hmac.compare_digest(received_signature, expected_signature):
+            if hmac.compare_digest(received_digest, expected_digest):
                 logger.info("Signature verified successfully.")
                 return True
             else:
@@ -90,8 +152,31 @@ class WebhookSecurity:
                 return False
                 
         except Exception as e:
-            logger.error(f"Error during signature verification: {e}")
+            logger.error("Error during signature verification: %s", e)
             return False
+    
+    def verify_signature(self, payload: bytes, received_signature: Optional[str]) -> bool:
+        """
+        Verify webhook signature against the payload.
+        
+        Args:
+            payload: Raw payload bytes
+            received_signature: Signature from the webhook header
+            
+        Returns:
+            True if signature is valid or no secret is configured, False otherwise
+        """
+        # Skip verification if no secret is configured
+        if not self.secret:
+            logger.warning("Webhook secret not configured. Skipping signature verification.")
+            return True
+        
+        if not self.is_signature_well_formed(received_signature):
+            return False
+        
+        mac = self.new_hmac()
+        mac.update(payload)
+        return self.verify_hmac(mac, received_signature)
 
 
 # Default instance for backward compatibility
@@ -110,3 +195,40 @@ def verify_signature(payload_body: bytes, signature_header: Optional[str]) -> bo
         True if signature is valid, False otherwise
     """
     return _default_security.verify_signature(payload_body, signature_header)
+
+
+def new_hmac() -> hmac.HMAC:
+    """
+    Create a keyed HMAC object for incremental signature computation.
+    
+    Returns:
+        Keyed HMAC object
+    """
+    return _default_security.new_hmac()
+
+
+def is_signature_well_formed(signature_header: Optional[str]) -> bool:
+    """
+    Check that a signature header is present and has the length of a signature.
+    
+    Args:
+        signature_header: Signature from the webhook header
+        
+    Returns:
+        True if the header could hold a valid signature, False otherwise
+    """
+    return WebhookSecurity.is_signature_well_formed(signature_header)
+
+
+def verify_hmac(mac: hmac.HMAC, signature_header: Optional[str]) -> bool:
+    """
+    Verify webhook signature against an incrementally computed HMAC.
+    
+    Args:
+        mac: HMAC object fed with the raw payload bytes
+        signature_header: Signature from the webhook header
+        
+    Returns:
+        True if signature is valid, False otherwise
+    """
+    return _default_security.verify_hmac(mac, signature_header)
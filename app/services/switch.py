@@ -4,21 +4,565 @@ Switch port management service for configuring switch ports with VLANs.
 This module handles network switch operations using netmiko to configure
 individual switch ports with specific VLANs for switch port reservations.
 """
+import asyncio
+import functools
 import logging
-from typing import Optional
-
-from netmiko import ConnectHandler, NetmikoTimeoutException, NetmikoAuthenticationException
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple, TypeVar
 
 from .. import config
 
+if TYPE_CHECKING:
+    # netmiko (with paramiko/cryptography) is imported on first connection to keep startup fast
+    from netmiko import ConnectHandler
+
 logger = config.logger
 
+_T = TypeVar("_T")
+
+# Name prefixes of switch interfaces reported in the VLAN "Ports" column
+_INTERFACE_PREFIX_RE = re.compile(r"(?:gi|fa|eth|te|tw|hu|ae|xe)", re.IGNORECASE)
+
+# Header line of "show vlan" tables
+_VLAN_HEADER_RE = re.compile(r"VLAN.*Name.*Status.*Ports")
+
+# Resource names are used verbatim as interface names (e.g. "Hu1/0/1", "GigabitEthernet 1/0/24",
+# "1/1/1"); names with control characters (newlines included), ";", "|" or "?", which could
+# end the CLI line or inject commands, are rejected before they reach the switch
+_INTERFACE_NAME_RE = re.compile(r"[^\x00-\x1f\x7f;|?]+")
+
+# Seconds the interfaces found on a VLAN are reused before querying the switch again
+_INTERFACE_CACHE_TTL = 10.0
+
+# Seconds connection attempts fail immediately after the switch could not be reached
+_UNREACHABLE_RETRY_DELAY = 10.0
+
+
+def _vlan_commands(vlan_id: str, username: str) -> List[str]:
+    """
+    Build the config commands creating or verifying a reservation VLAN.
+    
+    Args:
+        vlan_id: ID of the VLAN
+        username: Username for VLAN naming
+        
+    Returns:
+        Commands for send_config_set
+    """
+    return [f"vlan {vlan_id}", f"name prognose-{username}-{vlan_id}", "exit"]
+
+
+def _port_commands(interface_name: str, vlan_id: str) -> List[str]:
+    """
+    Build the config commands making a port an enabled access port of a VLAN.
+    
+    Args:
+        interface_name: Name of the interface
+        vlan_id: ID of the VLAN
+        
+    Returns:
+        Commands for send_config_set
+    """
+    return [
+        f"interface {interface_name}",
+        "switchport mode access",
+        f"switchport access vlan {vlan_id}",
+        "no shutdown",
+        "exit"
+    ]
+
+
+def _textfsm_vlan_interfaces(rows: List[dict], vlan_id: str) -> List[str]:
+    """
+    Extract the interfaces of a VLAN from TextFSM-parsed "show vlan" rows.
+    
+    Args:
+        rows: Rows returned by netmiko with use_textfsm=True
+        vlan_id: ID of the VLAN to extract
+        
+    Returns:
+        Interface names using the VLAN
+    """
+    interfaces = []
+    for row in rows:
+        if str(row.get("vlan_id")) != str(vlan_id):
+            continue
+        ports = row.get("interfaces") or []
+        if isinstance(ports, str):
+            ports = ports.split(',')
+        for port in ports:
+            interface = port.strip()
+            if interface and _INTERFACE_PREFIX_RE.match(interface):
+                interfaces.append(interface)
+    return interfaces
+
 
 class SwitchConfigurationError(Exception):
     """Raised when there's an error in switch configuration."""
     pass
 
 
+class _PooledSession:
+    """An open switch session with its bookkeeping."""
+    
+    __slots__ = ("device", "created_at", "last_used", "last_keepalive", "privileged")
+    
+    def __init__(self, device: "ConnectHandler"):
+        """
+        Initialize the session entry.
+        
+        Args:
+            device: Newly connected netmiko device
+        """
+        self.device = device
+        self.created_at = self.last_used = self.last_keepalive = time.monotonic()
+        self.privileged = False  # The session has entered enable mode
+
+
+class _SwitchConnectionPool:
+    """
+    Keeps switch SSH sessions open between operations.
+    
+    netmiko channels are not thread-safe, so each session is handed out to one
+    operation at a time and at most max_size operations run concurrently.
+    Sessions that have been idle or open for too long, or that are no longer
+    alive, are re-established on the next acquire(); idle sessions are also
+    closed in the background once they exceed the idle timeout.
+    """
+    
+    def __init__(
+        self,
+        connect: Callable[[], "ConnectHandler"],
+        enabled: bool = True,
+        idle_timeout: float = 300,
+        max_age: float = 3600,
+        save_debounce: float = 0,
+        max_size: int = 1,
+        keepalive_interval: float = 0
+    ):
+        """
+        Initialize the pool.
+        
+        Args:
+            connect: Factory opening a new switch session
+            enabled: Keep sessions open between operations; if False every
+                operation opens and closes its own session
+            idle_timeout: Seconds an unused session is kept open
+            max_age: Seconds before a session is re-established
+            save_debounce: Seconds to coalesce configuration saves over; 0 saves
+                after every change
+            max_size: Maximum number of sessions open at the same time
+            keepalive_interval: Seconds of inactivity after which an idle session
+                is sent a keepalive, so the switch does not time it out first; 0
+                disables keepalives
+        """
+        self._connect = connect
+        self.enabled = enabled
+        self.idle_timeout = idle_timeout
+        self.max_age = max_age
+        self.max_size = max(1, max_size)
+        self.keepalive_interval = keepalive_interval
+        
+        self.save_debounce = save_debounce
+        
+        # Idle sessions, most recently used last, and the number of open sessions
+        self._idle: Deque[_PooledSession] = deque()
+        self._size = 0
+        self._in_use: Dict[int, _PooledSession] = {}
+        self._cond = threading.Condition()
+        self._reaper: Optional[threading.Timer] = None
+        
+        # Running configuration changed but not yet saved, and the pending save
+        self._dirty = False
+        self._save_timer: Optional[threading.Timer] = None
+    
+    def _is_stale(self, session: _PooledSession, now: float) -> bool:
+        """Check whether a session has exceeded its idle time or age."""
+        return now - session.last_used > self.idle_timeout or now - session.created_at > self.max_age
+    
+    def ensure_enable(self, device: "ConnectHandler") -> None:
+        """
+        Enter privileged mode once per session instead of before every change.
+        
+        Args:
+            device: Session acquired from this pool
+        """
+        session = self._in_use.get(id(device))
+        if session is None or not session.privileged:
+            device.enable()
+            if session is not None:
+                session.privileged = True
+    
+    def save_config(self, device: "ConnectHandler") -> None:
+        """
+        Save the switch configuration, or schedule a coalesced save.
+        
+        Args:
+            device: Session acquired from this pool
+        """
+        if self.save_debounce <= 0:
+            device.save_config()
+            return
+        
+        with self._cond:
+            self._dirty = True
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(self.save_debounce, self._flush_save)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+    
+    def _take_dirty(self) -> bool:
+        """Clear the unsaved-changes flag, returning whether it was set."""
+        with self._cond:
+            dirty, self._dirty = self._dirty, False
+            return dirty
+    
+    def _flush_save(self) -> None:
+        """Save configuration changes accumulated since the last save."""
+        with self._cond:
+            self._save_timer = None
+            if not self._dirty:
+                return
+        
+        try:
+            with self.acquire() as device:
+                if self._take_dirty():
+                    try:
+                        device.save_config()
+                    except Exception:
+                        with self._cond:
+                            self._dirty = True
+                        raise
+                    logger.info("Saved switch configuration")
+        except Exception as e:
+            logger.error("Failed to save switch configuration: %s", e)
+    
+    def _discard(self, session: _PooledSession) -> None:
+        """Disconnect a session and release its slot, saving pending changes first."""
+        if self._take_dirty():
+            try:
+                session.device.save_config()
+            except Exception as e:
+                with self._cond:
+                    self._dirty = True
+                logger.error("Failed to save switch configuration before disconnecting: %s", e)
+        
+        try:
+            session.device.disconnect()
+            logger.info("Disconnected from switch")
+        except Exception as e:
+            logger.debug("Error while disconnecting from switch: %s", e)
+        finally:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+    
+    def _checkout(self) -> _PooledSession:
+        """
+        Take a live idle session, or open a new one if the pool has room.
+        
+        Returns:
+            Session reserved for the caller
+            
+        Raises:
+            SwitchConfigurationError: If connection fails
+        """
+        while True:
+            with self._cond:
+                while not self._idle and self._size >= self.max_size:
+                    self._cond.wait()
+                if self._idle:
+                    session = self._idle.pop()
+                else:
+                    self._size += 1
+                    session = None
+            
+            if session is None:
+                try:
+                    return _PooledSession(self._connect())
+                except BaseException:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            
+            if not self._is_stale(session, time.monotonic()) and session.device.is_alive():
+                return session
+            self._discard(session)
+    
+    def _checkin(self, session: _PooledSession) -> None:
+        """Return a session to the idle sessions, or close it if it should not be reused."""
+        session.last_used = now = time.monotonic()
+        if not self.enabled or now - session.created_at > self.max_age:
+            self._discard(session)
+            return
+        
+        with self._cond:
+            self._idle.append(session)
+            self._cond.notify()
+            self._schedule_reaper()
+    
+    def _schedule_reaper(self) -> None:
+        """Start the idle-session reaper if sessions are idle and none is pending (lock must be held)."""
+        if self._reaper is None and self._idle:
+            interval = self.idle_timeout
+            if 0 < self.keepalive_interval < interval:
+                interval = self.keepalive_interval
+            self._reaper = threading.Timer(interval, self._reap)
+            self._reaper.daemon = True
+            self._reaper.start()
+    
+    def _reap(self) -> None:
+        """Close idle sessions that have exceeded their idle time or age, and keep the others alive."""
+        with self._cond:
+            self._reaper = None
+            now = time.monotonic()
+            stale = [session for session in self._idle if self._is_stale(session, now)]
+            for session in stale:
+                self._idle.remove(session)
+            # Sessions due a keepalive are taken out of the idle sessions while they are pinged
+            due = []
+            if self.keepalive_interval > 0:
+                due = [
+                    session for session in self._idle
+                    if now - max(session.last_used, session.last_keepalive) >= self.keepalive_interval
+                ]
+                for session in due:
+                    self._idle.remove(session)
+            self._schedule_reaper()
+        
+        for session in stale:
+            self._discard(session)
+        
+        for session in due:
+            try:
+                session.device.find_prompt()
+            except Exception as e:
+                logger.debug("Keepalive to switch failed, closing the session: %s", e)
+                self._discard(session)
+                continue
+            
+            # Back among the least recently used; the keepalive does not count as use
+            session.last_keepalive = time.monotonic()
+            with self._cond:
+                self._idle.appendleft(session)
+                self._cond.notify()
+                self._schedule_reaper()
+    
+    @contextmanager
+    def acquire(self) -> Iterator["ConnectHandler"]:
+        """
+        Provide exclusive access to a live switch session.
+        
+        The session is dropped if the operation raises, so the next operation
+        starts from a clean session.
+        
+        Yields:
+            Connected netmiko device instance
+            
+        Raises:
+            SwitchConfigurationError: If connection fails
+        """
+        session = self._checkout()
+        self._in_use[id(session.device)] = session
+        try:
+            yield session.device
+        except BaseException:
+            del self._in_use[id(session.device)]
+            self._discard(session)
+            raise
+        
+        del self._in_use[id(session.device)]
+        self._checkin(session)
+    
+    def close(self) -> None:
+        """Close the idle sessions, saving pending configuration changes."""
+        with self._cond:
+            for timer in (self._save_timer, self._reaper):
+                if timer is not None:
+                    timer.cancel()
+            self._save_timer = self._reaper = None
+            idle = list(self._idle)
+            self._idle.clear()
+        
+        for session in idle:
+            self._discard(session)
+
+
+class _SwitchSession:
+    """
+    Switch operations sharing one acquired switch connection.
+    
+    Obtained from SwitchPortManager.session(); valid only inside its with block.
+    """
+    
+    __slots__ = ("_manager", "_device")
+    
+    def __init__(self, manager: "SwitchPortManager", device: "ConnectHandler"):
+        """
+        Initialize the session.
+        
+        Args:
+            manager: Manager owning the connection pool and caches
+            device: Connected netmiko device acquired from the pool
+        """
+        self._manager = manager
+        self._device = device
+    
+    def get_interfaces(self, vlan_id: str) -> List[str]:
+        """
+        Get list of interfaces that are currently using the specified VLAN.
+        
+        Args:
+            vlan_id: ID of the VLAN to check
+            
+        Returns:
+            List of interface names using the VLAN, empty list if none found
+        """
+        cached = self._manager._cached_interfaces(vlan_id)
+        if cached is not None:
+            return cached
+        return self._manager._read_interfaces_using_vlan(self._device, vlan_id)
+    
+    def configure_port(self, interface_name: str, vlan_id: str, username: str) -> bool:
+        """
+        Configure a switch port with a specific VLAN, creating the VLAN if needed.
+        
+        Args:
+            interface_name: Name of the interface to configure
+            vlan_id: ID of the VLAN to assign to the port
+            username: Username for VLAN naming
+            
+        Returns:
+            True if configuration was successful, False otherwise
+        """
+        manager = self._manager
+        if not manager._is_valid_port(interface_name, vlan_id):
+            return False
+        
+        # Create or verify VLAN exists and assign port to it
+        if not manager._configure_vlan_and_port(self._device, interface_name, vlan_id, username):
+            return False
+        
+        manager.logger.info(
+            "Successfully configured switch interface %s with VLAN ID '%s'", interface_name, vlan_id
+        )
+        return True
+    
+    def restore_port(self, interface_name: str) -> bool:
+        """
+        Restore a switch port to the default VLAN.
+        
+        Args:
+            interface_name: Name of the interface to restore
+            
+        Returns:
+            True if restoration was successful, False otherwise
+        """
+        manager = self._manager
+        if not manager._is_valid_port(interface_name, config.DEFAULT_VLAN_ID):
+            return False
+        
+        # Assign port to default VLAN
+        if not manager._assign_port_to_vlan(self._device, interface_name, config.DEFAULT_VLAN_ID):
+            return False
+        
+        manager.logger.info(
+            "Successfully restored switch interface %s to default VLAN %s", interface_name, config.DEFAULT_VLAN_ID
+        )
+        return True
+
+
+class _PortConfigBatcher:
+    """
+    Coalesces port configurations submitted within a short window.
+    
+    Callers block until the config set holding their assignment has been
+    applied. Assignments are grouped by username, since it is part of the
+    VLAN names, and each group is applied with one config set and one save.
+    """
+    
+    def __init__(self, apply: Callable[[List[Tuple[str, str]], str], bool], window: float, max_size: int):
+        """
+        Initialize the batcher.
+        
+        Args:
+            apply: Applies (interface name, VLAN ID) assignments for a username
+            window: Seconds to wait for further assignments after the first one
+            max_size: Number of pending assignments that are applied without waiting
+        """
+        self._apply = apply
+        self.window = window
+        self.max_size = max(1, max_size)
+        
+        self._pending: List[Tuple[str, str, str, Future]] = []
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+    
+    def submit(self, interface_name: str, vlan_id: str, username: str) -> bool:
+        """
+        Queue a port assignment and wait until its batch has been applied.
+        
+        Args:
+            interface_name: Name of the interface to configure
+            vlan_id: ID of the VLAN to assign to the port
+            username: Username for VLAN naming
+            
+        Returns:
+            True if the batch holding the assignment was applied, False otherwise
+        """
+        future: Future = Future()
+        with self._lock:
+            self._pending.append((interface_name, vlan_id, username, future))
+            if len(self._pending) >= self.max_size:
+                batch = self._take_pending()
+            else:
+                batch = None
+                if self._timer is None:
+                    self._timer = threading.Timer(self.window, self._flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+        
+        if batch:
+            self._apply_batch(batch)
+        return future.result()
+    
+    def _take_pending(self) -> List[Tuple[str, str, str, Future]]:
+        """Detach the pending assignments and their timer (lock must be held)."""
+        batch, self._pending = self._pending, []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+    
+    def _flush(self) -> None:
+        """Apply the assignments collected during the window."""
+        with self._lock:
+            batch = self._take_pending()
+        if batch:
+            self._apply_batch(batch)
+    
+    def _apply_batch(self, batch: List[Tuple[str, str, str, Future]]) -> None:
+        """Apply a batch, one config set per username, and release the waiting callers."""
+        by_username: Dict[str, List[Tuple[str, str, str, Future]]] = {}
+        for entry in batch:
+            by_username.setdefault(entry[2], []).append(entry)
+        
+        for username, entries in by_username.items():
+            try:
+                success = self._apply([(interface_name, vlan_id) for interface_name, vlan_id, _, _ in entries], username)
+            except Exception as e:
+                logger.error("Failed to apply batched switch port configuration: %s", e)
+                success = False
+            for *_, future in entries:
+                future.set_result(success)
+
+
 class SwitchPortManager:
     """Manages switch port configurations for individual port reservations."""
     
@@ -27,7 +571,47 @@ class SwitchPortManager:
         self.logger = logger
         
         # Switch connection configuration
-        self.switch_config = {
+        self.switch_config = self._build_switch_config()
+        # Monotonic time before which connection attempts fail immediately after a failed connect
+        self._unreachable_until = 0.0
+        
+        # Interfaces found per VLAN ID, with the time they were read; cleared on port changes
+        self._interface_cache: Dict[str, Tuple[float, List[str]]] = {}
+        self._interface_cache_lock = threading.Lock()
+        
+        # Switch sessions reused across operations
+        self._pool = _SwitchConnectionPool(
+            self._connect_to_switch,
+            enabled=config.CONNECTION_POOL_ENABLED,
+            idle_timeout=config.CONNECTION_POOL_IDLE_TIMEOUT,
+            max_age=config.CONNECTION_POOL_MAX_AGE,
+            save_debounce=config.SWITCH_SAVE_DEBOUNCE_SEC,
+            max_size=config.CONNECTION_POOL_MAX_SIZE,
+            keepalive_interval=config.CONNECTION_POOL_KEEPALIVE_INTERVAL
+        )
+        
+        # Concurrent port configurations committed together, if enabled
+        self._batcher: Optional[_PortConfigBatcher] = None
+        if config.SWITCH_BATCH_WINDOW_SEC > 0:
+            self._batcher = _PortConfigBatcher(
+                self.configure_switch_ports, config.SWITCH_BATCH_WINDOW_SEC, config.SWITCH_BATCH_MAX_SIZE
+            )
+        
+        # Threads running switch operations for the event loop: one per pooled session,
+        # or enough to fill a batch while their operations wait for it
+        workers = self._pool.max_size if self._batcher is None else max(self._pool.max_size, self._batcher.max_size)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="switch")
+    
+    @staticmethod
+    @functools.cache
+    def _build_switch_config() -> Dict[str, object]:
+        """
+        Build the netmiko connection settings from the configuration, once per process.
+        
+        Returns:
+            Keyword arguments for netmiko's ConnectHandler (shared, do not modify)
+        """
+        return {
             "host": config.SWITCH_HOST,
             "username": config.SWITCH_USERNAME,
             "password": config.SWITCH_PASSWORD,
@@ -36,7 +620,7 @@ class SwitchPortManager:
             "timeout": config.SWITCH_TIMEOUT
         }
     
-    def _connect_to_switch(self) -> ConnectHandler:
+    def _connect_to_switch(self) -> "ConnectHandler":
         """
         Establish connection to the network switch.
         
@@ -46,73 +630,187 @@ class SwitchPortManager:
         Raises:
             SwitchConfigurationError: If connection fails
         """
+        # Fail fast while the switch is known to be unreachable instead of waiting for another timeout
+        if time.monotonic() < self._unreachable_until:
+            raise SwitchConfigurationError("Switch unreachable, not retrying the connection yet")
+        
+        from netmiko import ConnectHandler, NetmikoTimeoutException, NetmikoAuthenticationException
+        
         try:
             device = ConnectHandler(**self.switch_config)
-            self.logger.info(f"Successfully connected to switch: {self.switch_config['host']}")
+            self.logger.info("Successfully connected to switch: %s", self.switch_config['host'])
             return device
         except NetmikoTimeoutException as e:
+            self._unreachable_until = time.monotonic() + _UNREACHABLE_RETRY_DELAY
             raise SwitchConfigurationError(f"Timeout connecting to switch: {e}")
         except NetmikoAuthenticationException as e:
             raise SwitchConfigurationError(f"Authentication failed for switch: {e}")
         except Exception as e:
+            self._unreachable_until = time.monotonic() + _UNREACHABLE_RETRY_DELAY
             raise SwitchConfigurationError(f"Failed to connect to switch: {e}")
     
-    def _create_or_verify_vlan(self, device: ConnectHandler, vlan_id: str, username: str) -> bool:
+    def close(self) -> None:
+        """Finish running switch operations and close the pooled switch connections."""
+        self._executor.shutdown(wait=True)
+        self._pool.close()
+    
+    async def run(self, func: Callable[..., _T], *args: Any) -> _T:
         """
-        Create a VLAN with the given ID or verify it exists.
+        Run a blocking switch operation without blocking the event loop.
+        
+        Operations queue on a dedicated executor sized to the connection pool,
+        so a burst of webhooks does not occupy the event loop's default
+        executor with threads waiting for a switch session.
         
         Args:
-            device: Connected netmiko device
-            vlan_id: ID of the VLAN to create/verify
-            username: Username for VLAN naming
+            func: Blocking callable performing the switch operation
+            *args: Arguments for func
             
         Returns:
-            True if successful, False otherwise
+            The result of func
         """
-        try:
-            # Create or verify VLAN exists
-            commands = [
-                f"vlan {vlan_id}",
-                f"name prognose-{username}-{vlan_id}",
-                "exit"
-            ]
-            
-            device.enable()  # Enter privileged mode
-            output = device.send_config_set(commands)
-            device.save_config()  # Save configuration
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+    
+    @property
+    def batching(self) -> bool:
+        """Whether configure_switch_port() commits concurrent configurations together."""
+        return self._batcher is not None
+    
+    @contextmanager
+    def session(self) -> Iterator["_SwitchSession"]:
+        """
+        Run several switch operations over a single switch session.
+        
+        Example:
+            with manager.session() as switch_session:
+                if not switch_session.get_interfaces(vlan_id):
+                    switch_session.configure_port(interface_name, vlan_id, username)
+        
+        Yields:
+            Operations bound to the acquired switch connection
             
-            self.logger.info(f"Created/verified VLAN '{vlan_id}' on switch")
-            self.logger.debug(f"VLAN creation output: {output}")
-            return True
+        Raises:
+            SwitchConfigurationError: If connection fails
+        """
+        with self._pool.acquire() as device:
+            yield _SwitchSession(self, device)
+    
+    def _is_valid_port(self, interface_name: str, vlan_id: str) -> bool:
+        """
+        Check a port assignment before it is sent to the switch CLI.
+        
+        Args:
+            interface_name: Name of the interface to configure
+            vlan_id: ID of the VLAN to assign to the port
             
-        except Exception as e:
-            self.logger.error(f"Failed to create/verify VLAN '{vlan_id}': {e}")
+        Returns:
+            True if the assignment can be applied, False otherwise (the reason is logged)
+        """
+        if not interface_name or not vlan_id:
+            self.logger.error("Interface name and VLAN ID are required")
+            return False
+        
+        if not _INTERFACE_NAME_RE.fullmatch(interface_name):
+            self.logger.error("Invalid interface name %r", interface_name)
             return False
+        
+        return True
+    
+    def _cache_interfaces(self, vlan_id: str, interfaces: List[str]) -> List[str]:
+        """
+        Remember the interfaces found on a VLAN.
+        
+        Args:
+            vlan_id: ID of the VLAN
+            interfaces: Interfaces using the VLAN
+            
+        Returns:
+            The interfaces, for convenient returning
+        """
+        with self._interface_cache_lock:
+            self._interface_cache[vlan_id] = (time.monotonic(), interfaces)
+        return interfaces
+    
+    def _invalidate_interface_cache(self) -> None:
+        """Forget cached VLAN memberships before the switch configuration changes."""
+        with self._interface_cache_lock:
+            self._interface_cache.clear()
     
-    def _find_available_vlan_id(self, device: ConnectHandler, start_id: int = 100) -> Optional[int]:
+    def _cached_interfaces(self, vlan_id: str) -> Optional[List[str]]:
         """
-        Find an available VLAN ID starting from the given ID.
+        Get the interfaces recently found on a VLAN.
+        
+        Args:
+            vlan_id: ID of the VLAN
+            
+        Returns:
+            Copy of the cached interfaces, or None if not cached or expired
+        """
+        with self._interface_cache_lock:
+            cached = self._interface_cache.get(vlan_id)
+        if cached is not None and time.monotonic() - cached[0] < _INTERFACE_CACHE_TTL:
+            return list(cached[1])
+        return None
+    
+    def _read_interfaces_using_vlan(self, device: "ConnectHandler", vlan_id: str) -> List[str]:
+        """
+        Query the switch for the interfaces using a VLAN.
         
         Args:
             device: Connected netmiko device
-            start_id: Starting VLAN ID to search from
+            vlan_id: ID of the VLAN to check
             
         Returns:
-            Available VLAN ID or None if not found
+            List of interface names using the VLAN, empty list if the VLAN does not exist
         """
-        try:
-            show_vlan_output = device.send_command("show vlan brief")
+        # Get interfaces using this specific VLAN. With a matching ntc-template
+        # netmiko returns parsed rows; otherwise the raw output is parsed below
+        parsed = device.send_command(f"show vlan id {vlan_id}", use_textfsm=True)
+        if isinstance(parsed, list):
+            return list(self._cache_interfaces(vlan_id, _textfsm_vlan_interfaces(parsed, vlan_id)))
+        
+        show_vlan_output = parsed
+        
+        # Check if VLAN doesn't exist or the switch rejected the VLAN ID
+        if "not found in current VLAN database" in show_vlan_output or "Invalid input" in show_vlan_output:
+            self.logger.debug("VLAN ID '%s' does not exist on switch", vlan_id)
+            return list(self._cache_interfaces(vlan_id, []))
+        
+        # Parse the output to find interfaces for this VLAN
+        interfaces = []
+        
+        # Find the header line and locate the Ports column
+        header_found = False
+        ports_column_start = -1
+        
+        for line in show_vlan_output.splitlines():
+            line = line.strip()
             
-            # Check VLAN IDs from start_id to 4094
-            for vlan_id in range(start_id, 4095):
-                if str(vlan_id) not in show_vlan_output:
-                    return vlan_id
+            # Look for the header line with "Ports"
+            if _VLAN_HEADER_RE.search(line):
+                header_found = True
+                ports_column_start = line.find("Ports")
+                continue
             
-            return None
+            # Skip separator lines
+            if line.startswith('----'):
+                continue
             
-        except Exception as e:
-            self.logger.error(f"Error finding available VLAN ID: {e}")
-            return None
+            # If we found the header and this line starts with our VLAN ID
+            if header_found and line.startswith(str(vlan_id)):
+                # Extract the ports column content
+                if ports_column_start >= 0 and len(line) > ports_column_start:
+                    ports_part = line[ports_column_start:].strip()
+                    
+                    # Parse comma-separated interfaces, keeping only entries
+                    # that look like interface names
+                    for iface in ports_part.split(','):
+                        interface = iface.strip()
+                        if interface and _INTERFACE_PREFIX_RE.match(interface):
+                            interfaces.append(interface)
+                break
+        
+        return list(self._cache_interfaces(vlan_id, interfaces))
     
     def get_interfaces_using_vlan(self, vlan_id: str) -> list:
         """
@@ -124,74 +822,18 @@ class SwitchPortManager:
         Returns:
             List of interface names using the VLAN, empty list if none found or error
         """
+        cached = self._cached_interfaces(vlan_id)
+        if cached is not None:
+            return cached
+        
         try:
-            device = self._connect_to_switch()
-            
-            try:
-                # Get interfaces using this specific VLAN
-                show_vlan_output = device.send_command(f"show vlan id {vlan_id}")
-                
-                # Check if VLAN doesn't exist
-                if "not found in current VLAN database" in show_vlan_output:
-                    self.logger.debug(f"VLAN ID '{vlan_id}' does not exist on switch")
-                    return []
-                
-                # Parse the output to find interfaces for this VLAN
-                lines = show_vlan_output.split('\n')
-                interfaces = []
-                
-                # Find the header line and locate the Ports column
-                header_found = False
-                ports_column_start = -1
-                
-                for i, line in enumerate(lines):
-                    line = line.strip()
-                    
-                    # Look for the header line with "Ports"
-                    if "VLAN" in line and "Name" in line and "Status" in line and "Ports" in line:
-                        header_found = True
-                        ports_column_start = line.find("Ports")
-                        continue
-                    
-                    # Skip separator lines
-                    if line.startswith('----'):
-                        continue
-                    
-                    # If we found the header and this line starts with our VLAN ID
-                    if header_found and line.startswith(str(vlan_id)):
-                        # Extract the ports column content
-                        if ports_column_start >= 0 and len(line) > ports_column_start:
-                            ports_part = line[ports_column_start:].strip()
-                            
-                            # Parse comma-separated interfaces
-                            if ports_part:
-                                interface_names = [iface.strip() for iface in ports_part.split(',') if iface.strip()]
-                                interfaces.extend(interface_names)
-                        break
-                
-                # Clean up the interface names - remove any non-interface entries
-                cleaned_interfaces = []
-                for interface in interfaces:
-                    # Only keep entries that look like interface names
-                    if interface and any(interface.lower().startswith(prefix) for prefix in 
-                                       ['gi', 'fa', 'eth', 'te', 'tw', 'hu', 'ae', 'xe']):
-                        cleaned_interfaces.append(interface)
-                
-                return cleaned_interfaces
-                
-            finally:
-                device.disconnect()
-                
+            with self.session() as switch_session:
+                return switch_session.get_interfaces(vlan_id)
         except Exception as e:
-            # If the VLAN doesn't exist, the command might fail - that's normal
-            if "invalid" in str(e).lower() or "not found" in str(e).lower():
-                self.logger.debug(f"VLAN ID '{vlan_id}' does not exist on switch")
-                return []
-            else:
-                self.logger.error(f"Error getting interfaces using VLAN ID '{vlan_id}': {e}")
-                return []
+            self.logger.error("Error getting interfaces using VLAN ID '%s': %s", vlan_id, e)
+            return []
     
-    def _assign_port_to_vlan(self, device: ConnectHandler, interface_name: str, vlan_id: str) -> bool:
+    def _assign_port_to_vlan(self, device: "ConnectHandler", interface_name: str, vlan_id: str) -> bool:
         """
         Assign a switch port to a VLAN.
         
@@ -204,31 +846,59 @@ class SwitchPortManager:
             True if successful, False otherwise
         """
         try:
-            commands = [
-                f"interface {interface_name}",
-                "switchport mode access",
-                f"switchport access vlan {vlan_id}",
-                "no shutdown",
-                "exit"
-            ]
+            commands = _port_commands(interface_name, vlan_id)
+            
+            self._pool.ensure_enable(device)  # Enter privileged mode
+            self._invalidate_interface_cache()
+            output = device.send_config_set(commands)
+            self._pool.save_config(device)  # Save configuration
+            
+            self.logger.info("Assigned interface %s to VLAN %s", interface_name, vlan_id)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Port assignment output: %s", output)
+            return True
+            
+        except Exception as e:
+            self.logger.error("Failed to assign interface %s to VLAN %s: %s", interface_name, vlan_id, e)
+            return False
+    
+    def _configure_vlan_and_port(
+        self, device: "ConnectHandler", interface_name: str, vlan_id: str, username: str
+    ) -> bool:
+        """
+        Create or verify a VLAN and assign a switch port to it in one config set.
+        
+        Args:
+            device: Connected netmiko device
+            interface_name: Name of the interface to assign
+            vlan_id: ID of the VLAN to create/verify and assign the port to
+            username: Username for VLAN naming
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            commands = _vlan_commands(vlan_id, username) + _port_commands(interface_name, vlan_id)
             
-            device.enable()  # Enter privileged mode
+            self._pool.ensure_enable(device)  # Enter privileged mode
+            self._invalidate_interface_cache()
             output = device.send_config_set(commands)
-            device.save_config()  # Save configuration
+            self._pool.save_config(device)  # Save configuration once for both changes
             
-            self.logger.info(f"Assigned interface {interface_name} to VLAN {vlan_id}")
-            self.logger.debug(f"Port assignment output: {output}")
+            self.logger.info("Created/verified VLAN '%s' and assigned interface %s to it", vlan_id, interface_name)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("VLAN and port configuration output: %s", output)
             return True
             
         except Exception as e:
-            self.logger.error(f"Failed to assign interface {interface_name} to VLAN {vlan_id}: {e}")
+            self.logger.error("Failed to configure interface %s with VLAN %s: %s", interface_name, vlan_id, e)
             return False
     
     def configure_switch_port(self, interface_name: str, vlan_id: str, username: str) -> bool:
         """
         Configure a switch port with a specific VLAN.
         
-        This method:
+        This method, in a single config set and configuration save:
         1. Creates or verifies the VLAN exists
         2. Assigns the switch port to the VLAN
         3. Enables the port
@@ -241,37 +911,70 @@ class SwitchPortManager:
         Returns:
             True if configuration was successful, False otherwise
         """
-        if not interface_name or not vlan_id:
-            self.logger.error("Interface name and VLAN ID are required")
+        if not self._is_valid_port(interface_name, vlan_id):
             return False
         
+        if self._batcher is not None:
+            # Committed together with the configurations submitted alongside it
+            return self._batcher.submit(interface_name, vlan_id, username)
+        
         try:
-            # Connect to switch
-            device = self._connect_to_switch()
-            
-            try:
-                # Create or verify VLAN exists
-                if not self._create_or_verify_vlan(device, vlan_id, username):
-                    return False
+            # Reuse the pooled switch connection
+            with self.session() as switch_session:
+                return switch_session.configure_port(interface_name, vlan_id, username)
                 
-                # Assign port to VLAN
-                if not self._assign_port_to_vlan(device, interface_name, vlan_id):
-                    return False
+        except SwitchConfigurationError as e:
+            self.logger.error("Switch configuration error: %s", e)
+            return False
+        except Exception as e:
+            self.logger.error("Unexpected error during switch port configuration: %s", e)
+            return False
+    
+    def configure_switch_ports(self, assignments: List[Tuple[str, str]], username: str) -> bool:
+        """
+        Configure several switch ports in a single configuration session.
+        
+        All VLANs are created or verified and all ports assigned with one config
+        set and a single configuration save, instead of one round per port.
+        
+        Args:
+            assignments: (interface name, VLAN ID) pairs to apply
+            username: Username for VLAN naming
+            
+        Returns:
+            True if every port was configured, False otherwise
+        """
+        if not assignments:
+            return True
+        
+        for interface_name, vlan_id in assignments:
+            if not self._is_valid_port(interface_name, vlan_id):
+                return False
+        
+        commands = []
+        for vlan_id in dict.fromkeys(vlan_id for _, vlan_id in assignments):
+            commands += _vlan_commands(vlan_id, username)
+        for interface_name, vlan_id in assignments:
+            commands += _port_commands(interface_name, vlan_id)
+        
+        try:
+            # Reuse the pooled switch connection
+            with self._pool.acquire() as device:
+                self._pool.ensure_enable(device)  # Enter privileged mode
+                self._invalidate_interface_cache()
+                output = device.send_config_set(commands)
+                self._pool.save_config(device)  # Save configuration
                 
-                self.logger.info(
-                    f"Successfully configured switch interface {interface_name} with VLAN ID '{vlan_id}'"
-                )
+                self.logger.info("Successfully configured %d switch interfaces", len(assignments))
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("Batch configuration output: %s", output)
                 return True
                 
-            finally:
-                device.disconnect()
-                self.logger.info("Disconnected from switch")
-                
         except SwitchConfigurationError as e:
-            self.logger.error(f"Switch configuration error: {e}")
+            self.logger.error("Switch configuration error: %s", e)
             return False
         except Exception as e:
-            self.logger.error(f"Unexpected error during switch port configuration: {e}")
+            self.logger.error("Unexpected error during batch switch port configuration: %s", e)
             return False
     
     def restore_port_to_default_vlan(self, interface_name: str) -> bool:
@@ -284,38 +987,26 @@ class SwitchPortManager:
         Returns:
             True if restoration was successful, False otherwise
         """
-        if not interface_name:
-            self.logger.error("Interface name is required")
+        if not self._is_valid_port(interface_name, config.DEFAULT_VLAN_ID):
             return False
         
         try:
-            # Connect to switch
-            device = self._connect_to_switch()
-            
-            try:
-                # Assign port to default VLAN
-                if not self._assign_port_to_vlan(device, interface_name, config.DEFAULT_VLAN_ID):
-                    return False
-                
-                self.logger.info(
-                    f"Successfully restored switch interface {interface_name} to default VLAN {config.DEFAULT_VLAN_ID}"
-                )
-                return True
-                
-            finally:
-                device.disconnect()
-                self.logger.info("Disconnected from switch")
+            # Reuse the pooled switch connection
+            with self.session() as switch_session:
+                return switch_session.restore_port(interface_name)
                 
         except SwitchConfigurationError as e:
-            self.logger.error(f"Switch configuration error during port restoration: {e}")
+            self.logger.error("Switch configuration error during port restoration: %s", e)
             return False
         except Exception as e:
-            self.logger.error(f"Unexpected error during port restoration: {e}")
+            self.logger.error("Unexpected error during port restoration: %s", e)
             return False
 
 
-# Global instance for use in other modules
-_switch_port_manager = None
+# Global instance for use in other modules, created on first use
+_switch_port_manager: Optional[SwitchPortManager] = None
+_switch_port_manager_lock = threading.Lock()
+
 
 def get_switch_port_manager() -> SwitchPortManager:
     """
@@ -326,5 +1017,27 @@ def get_switch_port_manager() -> SwitchPortManager:
     """
     global _switch_port_manager
     if _switch_port_manager is None:
-        _switch_port_manager = SwitchPortManager()
+        with _switch_port_manager_lock:
+            if _switch_port_manager is None:
+                _switch_port_manager = SwitchPortManager()
     return _switch_port_manager
+
+
+async def run_switch_operation(func: Callable[..., _T], *args: Any) -> _T:
+    """
+    Run a blocking switch operation on the global SwitchPortManager's executor.
+    
+    Args:
+        func: Blocking callable performing the switch operation
+        *args: Arguments for func
+        
+    Returns:
+        The result of func
+    """
+    return await get_switch_port_manager().run(func, *args)
+
+
+def close_switch_connection() -> None:
+    """Close the pooled connection of the global SwitchPortManager, if created."""
+    if _switch_port_manager is not None:
+        _switch_port_manager.close()
@@ -4,13 +4,24 @@ Utility functions for webhook payload processing.
 This module provides helper functions for safely parsing and handling
 custom parameters from webhook payloads, specifically for switch port configuration.
 """
-import json
+import functools
+import hmac
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict, Any, Optional, Union
 
+import orjson
 from fastapi import Request, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response
+from pydantic import ValidationError
+from starlette.requests import ClientDisconnect
+
+try:
+    # Optional C parser for ISO 8601 timestamps; the stdlib parser is used without it
+    from ciso8601 import parse_datetime as _parse_iso_datetime
+except ImportError:
+    _parse_iso_datetime = None
 
 from .config import logger
 from . import config, models
@@ -21,6 +32,40 @@ EVENT_START = 'EVENT_START'
 EVENT_END = 'EVENT_END'
 EVENT_DELETED = 'EVENT_DELETED'
 
+# Upper bound for preallocating the request body buffer from Content-Length
+MAX_PREALLOCATED_BODY_SIZE = 1024 * 1024  # 1 MiB
+
+# Byte markers used to recognise payloads for other resource types without parsing them
+_RESOURCE_TYPE_KEY = b'"resourceType"'
+_SWITCH_PORT_MARKER = b'"Switch Port"'
+
+# Switch port manager shared by all event handlers
+_switch_manager = switch.get_switch_port_manager()
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson instead of the stdlib json encoder."""
+    
+    def render(self, content: Any) -> bytes:
+        """Serialize content to JSON bytes using orjson."""
+        return orjson.dumps(content)
+
+
+@functools.lru_cache(maxsize=1024)
+def _load_custom_parameters(custom_params_str: str) -> Any:
+    """
+    Decode a custom parameters string, memoized for redelivered events.
+    
+    Invalid input raises and is therefore not cached.
+    
+    Args:
+        custom_params_str: JSON serialized string of custom parameters
+        
+    Returns:
+        Decoded value (shared between calls, do not modify)
+    """
+    return orjson.loads(custom_params_str)
+
 
 def parse_custom_parameters(custom_params_str: Optional[str]) -> Dict[str, Any]:
     """
@@ -35,10 +80,16 @@ def parse_custom_parameters(custom_params_str: Optional[str]) -> Dict[str, Any]:
     if not custom_params_str:
         return {}
     
+    # Only a JSON object can hold parameters; anything else is rejected without parsing
+    if not custom_params_str.lstrip().startswith("{"):
+        logger.warning("Error parsing customParameters: not a JSON object")
+        return {}
+    
     try:
-        return json.loads(custom_params_str)
-    except (json.JSONDecodeError, TypeError) as e:
-        logger.warning(f"Error parsing customParameters: {e}")
+        # Hand out a copy so callers cannot alter the cached value
+        return dict(_load_custom_parameters(custom_params_str))
+    except (orjson.JSONDecodeError, TypeError) as e:
+        logger.warning("Error parsing customParameters: %s", e)
         return {}
 
 
@@ -88,10 +139,14 @@ def get_vlan_id_from_custom_params(custom_params_str: Optional[str]) -> Optional
     return get_custom_parameter(custom_params, "vlan_id")
 
 
+@functools.lru_cache(maxsize=4096)
 def parse_timestamp(timestamp_str: str) -> datetime:
     """
     Parse timestamp string to datetime object.
     
+    Results are memoized, since retries and reservations in the same window
+    repeat the same timestamp strings.
+    
     Args:
         timestamp_str: ISO format timestamp string
         
@@ -101,6 +156,18 @@ def parse_timestamp(timestamp_str: str) -> datetime:
     Raises:
         ValueError: If timestamp format is invalid
     """
+    # Reject values that cannot start with a YYYY-MM-DD date before trying the parsers
+    if len(timestamp_str) < 10 or timestamp_str[4] != '-' or timestamp_str[7] != '-':
+        logger.error("Failed to parse timestamp '%s': not an ISO 8601 date", timestamp_str)
+        raise ValueError(f"Invalid timestamp format: {timestamp_str}")
+    
+    if _parse_iso_datetime is not None:
+        try:
+            # Handles the Z suffix and truncates nanoseconds to microseconds natively
+            return _parse_iso_datetime(timestamp_str)
+        except ValueError:
+            pass  # Let the stdlib parser below accept or report it
+    
     try:
         # Replace Z with timezone offset
         timestamp_str = timestamp_str.replace('Z', '+00:00')
@@ -124,10 +191,77 @@ def parse_timestamp(timestamp_str: str) -> datetime:
             
         return datetime.fromisoformat(timestamp_str)
     except ValueError as e:
-        logger.error(f"Failed to parse timestamp '{timestamp_str}': {e}")
+        logger.error("Failed to parse timestamp '%s': %s", timestamp_str, e)
         raise ValueError(f"Invalid timestamp format: {timestamp_str}")
 
 
+def utc_timestamp(value: datetime) -> float:
+    """
+    Convert a payload datetime to a POSIX timestamp, reading naive values as UTC.
+    
+    Args:
+        value: Datetime parsed from the payload
+        
+    Returns:
+        Seconds since the epoch
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+async def _read_body_fast(request: Request, mac: Optional[hmac.HMAC] = None) -> bytes:
+    """
+    Read the raw request body into a buffer preallocated from Content-Length.
+    
+    Falls back to Starlette's request.body() when the header is missing or
+    invalid, the declared size exceeds MAX_PREALLOCATED_BODY_SIZE, or the
+    body has already been consumed.
+    
+    Args:
+        request: FastAPI request object
+        mac: Optional HMAC object updated with each chunk as it is received
+        
+    Returns:
+        Raw payload bytes
+    """
+    content_length = request.headers.get("content-length")
+    if (
+        hasattr(request, "_body")
+        or not content_length
+        or not content_length.isdigit()
+        or int(content_length) > MAX_PREALLOCATED_BODY_SIZE
+    ):
+        body = await request.body()
+        if mac is not None:
+            mac.update(body)
+        return body
+    
+    buffer = bytearray(int(content_length))
+    offset = 0
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            raise ClientDisconnect()
+        if message["type"] != "http.request":
+            continue
+        
+        chunk = message.get("body", b"")
+        if mac is not None:
+            mac.update(chunk)
+        buffer[offset:offset + len(chunk)] = chunk
+        offset += len(chunk)
+        if not message.get("more_body", False):
+            break
+    
+    # Trim if the client sent fewer bytes than declared
+    del buffer[offset:]
+    
+    # Cache the body on the request like Starlette does, so later reads still work
+    request._body = bytes(buffer)
+    return request._body
+
+
 async def verify_webhook_signature(request: Request, signature: Optional[str]) -> bytes:
     """
     Verify webhook signature and return raw payload.
@@ -142,28 +276,128 @@ async def verify_webhook_signature(request: Request, signature: Optional[str]) -
     Raises:
         HTTPException: If signature verification fails
     """
-    raw_payload = await request.body()
-    
-    if config.WEBHOOK_SECRET:
-        if not security.verify_signature(raw_payload, signature):
-            logger.warning("Webhook signature verification failed")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid webhook signature"
-            )
+    if not config.WEBHOOK_SECRET:
+        return await _read_body_fast(request)
+    
+    # Reject missing or malformed signatures before the body is read and hashed;
+    # otherwise compute the HMAC while the body is received, so each byte is scanned once
+    if security.is_signature_well_formed(signature):
+        mac = security.new_hmac()
+        raw_payload = await _read_body_fast(request, mac)
+        verified = security.verify_hmac(mac, signature)
+    else:
+        verified = False
+    
+    if not verified:
+        logger.warning("Webhook signature verification failed")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid webhook signature"
+        )
     
     return raw_payload
 
 
+def parse_webhook_payload(
+    raw_payload: bytes
+) -> Union[models.WebhookPayload, models.EventWebhookPayload]:
+    """
+    Decode the raw webhook body and validate it against the matching model.
+    
+    Decoding and validation happen in a single pass in pydantic-core. The payload
+    model is picked by the discriminator of models.AnyWebhookPayload (EVENT_DELETED
+    payloads carry a nested "data" object), so only one model is validated per request.
+    
+    Args:
+        raw_payload: Raw payload bytes
+        
+    Returns:
+        Validated webhook payload model
+        
+    Raises:
+        RequestValidationError: If the body is not valid JSON or fails validation
+    """
+    try:
+        return models.webhook_payload_adapter.validate_json(raw_payload)
+    except ValidationError as e:
+        # Drop the union tag so locations match the request body
+        errors = [
+            {**error, "loc": ("body", *error["loc"][1:])}
+            for error in e.errors(include_url=False)
+        ]
+        raise RequestValidationError(errors, body=raw_payload)
+
+
+def peek_foreign_resource_type(raw_payload: bytes) -> Optional[str]:
+    """
+    Return the resource type of a single-event payload for another resource type.
+    
+    Bodies that mention "Switch Port" anywhere, or carry no resourceType, are left
+    to the full model validation; only the remaining ones are decoded, without
+    validation, to read the resource type.
+    
+    Args:
+        raw_payload: Raw payload bytes
+        
+    Returns:
+        The resourceType if the payload is not for a switch port, None otherwise
+    """
+    if _RESOURCE_TYPE_KEY not in raw_payload or _SWITCH_PORT_MARKER in raw_payload:
+        return None
+    
+    try:
+        data = orjson.loads(raw_payload)
+    except orjson.JSONDecodeError:
+        return None
+    
+    if not isinstance(data, dict) or "data" in data:
+        return None
+    
+    # The byte scan misses JSON-escaped spellings of "Switch Port"
+    resource_type = data.get("resourceType")
+    if not isinstance(resource_type, str) or resource_type == "Switch Port":
+        return None
+    return resource_type
+
+
 def create_success_response(action: str, resource_name: str, user_id: Optional[str]) -> JSONResponse:
     """Create a standardized success response for single event operations."""
-    return JSONResponse({
+    return ORJSONResponse({
         "status": "success",
         "message": f"Successfully {action}d switch port '{resource_name}'",
         "userId": user_id
     })
 
 
+def create_accepted_response(action: str, resource_name: str, user_id: Optional[str]) -> JSONResponse:
+    """Create a standardized response for operations that continue after the webhook is acknowledged."""
+    return ORJSONResponse({
+        "status": "accepted",
+        "message": f"Switch port '{resource_name}' will be {action}d",
+        "userId": user_id
+    }, status_code=status.HTTP_202_ACCEPTED)
+
+
+@functools.lru_cache(maxsize=256)
+def _no_action_body(message: str) -> bytes:
+    """Serialize a no-action response body once per distinct message."""
+    return orjson.dumps({"status": "success", "message": message})
+
+
+def create_no_action_response(message: str) -> Response:
+    """Create a standardized response for events that require no action."""
+    return Response(content=_no_action_body(message), media_type="application/json")
+
+
+def create_duplicate_response(resource_name: str, user_id: Optional[str]) -> JSONResponse:
+    """Create a standardized response for already processed (duplicate) events."""
+    return ORJSONResponse({
+        "status": "success",
+        "message": f"Event for switch port '{resource_name}' already processed",
+        "userId": user_id
+    })
+
+
 def handle_switch_port_start_event(
     payload: models.WebhookPayload
 ) -> bool:
@@ -182,36 +416,55 @@ def handle_switch_port_start_event(
         # Extract VLAN ID from custom parameters
         vlan_id = get_vlan_id_from_custom_params(custom_parameters)
         if not vlan_id:
-            logger.error(f"No vlan_id found in custom parameters for switch port '{resource_name}'")
+            logger.error("No vlan_id found in custom parameters for switch port '%s'", resource_name)
             return False
         
         # Use resource name directly as interface name
         interface_name = resource_name
         
-        # Check for VLAN conflicts before configuring
-        switch_manager = switch.get_switch_port_manager()
-        conflicting_interfaces = switch_manager.get_interfaces_using_vlan(vlan_id)
+        # Check for conflicts and configure over the same switch session
+        success: Optional[bool] = None
+        conflicts_checked = False
+        try:
+            with _switch_manager.session() as switch_session:
+                # Check for VLAN conflicts before configuring
+                conflicting_interfaces = switch_session.get_interfaces(vlan_id)
+                conflicts_checked = True
+                
+                # If there are conflicting interfaces, send warning notification
+                if conflicting_interfaces:
+                    logger.warning("VLAN ID '%s' is already in use by interfaces: %s", vlan_id, ', '.join(conflicting_interfaces))
+                    
+                    # Send VLAN conflict notification
+                    notification.send_vlan_conflict_notification(
+                        webhook_id=webhook_id,
+                        user_id=user_id,
+                        resource_name=resource_name,
+                        vlan_id=vlan_id,
+                        conflicting_interfaces=conflicting_interfaces,
+                        event_id=event_id,
+                        resource_id=resource_id
+                    )
+                
+                # Configure switch port with VLAN (proceed even if there are conflicts)
+                if not _switch_manager.batching:
+                    success = switch_session.configure_port(interface_name, vlan_id, username)
+        except switch.SwitchConfigurationError as e:
+            logger.error("Switch connection error while configuring port '%s': %s", interface_name, e)
+            success = False
+        except Exception as e:
+            if conflicts_checked:
+                raise
+            # The session was dropped with the failed check; configure over a new one
+            logger.error("Error getting interfaces using VLAN ID '%s': %s", vlan_id, e)
         
-        # If there are conflicting interfaces, send warning notification
-        if conflicting_interfaces:
-            logger.warning(f"VLAN ID '{vlan_id}' is already in use by interfaces: {', '.join(conflicting_interfaces)}")
-            
-            # Send VLAN conflict notification
-            notification.send_vlan_conflict_notification(
-                webhook_id=webhook_id,
-                user_id=user_id,
-                resource_name=resource_name,
-                vlan_id=vlan_id,
-                conflicting_interfaces=conflicting_interfaces,
-                event_id=event_id,
-                resource_id=resource_id
-            )
-        
-        # Configure switch port with VLAN (proceed even if there are conflicts)
-        success = switch_manager.configure_switch_port(interface_name, vlan_id, username)
+        if success is None:
+            # Batched with concurrent reservations, or retried after a failed
+            # conflict check, once the session has been released
+            success = _switch_manager.configure_switch_port(interface_name, vlan_id, username)
         
         if success:
-            logger.info(f"[{EVENT_START}] Successfully configured switch interface {interface_name} with VLAN ID '{vlan_id}' (Event ID: {event_id})")
+            logger.info("[%s] Successfully configured switch interface %s with VLAN ID '%s' (Event ID: %s)", EVENT_START, interface_name, vlan_id, event_id)
             
             # Send success notification
             notification.send_switch_port_notification(
@@ -228,7 +481,7 @@ def handle_switch_port_start_event(
                 webhook_id=webhook_id,
                 event_type=EVENT_START,
                 success=True,
-                payload_data=json.dumps(payload.model_dump()),
+                payload_data=payload.model_dump_json,
                 status_code=200,
                 response=f"Switch port '{resource_name}' configured with VLAN ID '{vlan_id}'",
                 retry_count=0,
@@ -236,7 +489,7 @@ def handle_switch_port_start_event(
                 resource_id=resource_id
             )
         else:
-            logger.error(f"[{EVENT_START}] Failed to configure switch interface {interface_name} with VLAN ID '{vlan_id}' (Event ID: {event_id})")
+            logger.error("[%s] Failed to configure switch interface %s with VLAN ID '%s' (Event ID: %s)", EVENT_START, interface_name, vlan_id, event_id)
             
             # Send failure notification
             notification.send_switch_port_notification(
@@ -252,7 +505,7 @@ def handle_switch_port_start_event(
         return success
         
     except Exception as e:
-        logger.error(f"Error configuring switch port '{resource_name}': {str(e)}")
+        logger.error("Error configuring switch port '%s': %s", resource_name, e)
         
         # Send failure notification
         notification.send_switch_port_notification(
@@ -268,38 +521,40 @@ def handle_switch_port_start_event(
         return False
 
 
+# Field extractors for end events: (resource_name, event_id, user_id, webhook_id, resource_id)
+_END_EVENT_UNPACKERS = {
+    models.WebhookPayload: lambda p: (
+        p.resource_name, p.event_id, p.user_id or "unknown", p.webhook_id, p.resource_id
+    ),
+    models.EventWebhookPayload: lambda p: (
+        p.data.resource.name, str(p.data.id), p.data.keycloak_id if p.data else "unknown",
+        p.webhook_id, p.data.resource.id
+    ),
+}
+
+
 def handle_switch_port_end_event(
     payload: Union[models.WebhookPayload, models.EventWebhookPayload]
 ) -> bool:
     """
     Handle switch port reservation end event. Returns True on success.
     """
-    if isinstance(payload, models.WebhookPayload):
-        resource_name = payload.resource_name
-        event_id = payload.event_id
-        user_id = payload.user_id or "unknown"
-        webhook_id = payload.webhook_id
-        resource_id = payload.resource_id
-    elif isinstance(payload, models.EventWebhookPayload):
-        resource_name = payload.data.resource.name
-        event_id = str(payload.data.id)
-        user_id = payload.data.keycloak_id if payload.data else "unknown"
-        webhook_id = payload.webhook_id
-        resource_id = payload.data.resource.id
-    else:
+    unpack = _END_EVENT_UNPACKERS.get(type(payload))
+    if unpack is None:
         logger.error("Invalid payload type for switch port end event.")
         return False
+    
+    resource_name, event_id, user_id, webhook_id, resource_id = unpack(payload)
 
     try:
         # Use resource name directly as interface name
         interface_name = resource_name
         
         # Restore switch port to default VLAN
-        switch_manager = switch.get_switch_port_manager()
-        success = switch_manager.restore_port_to_default_vlan(interface_name)
+        success = _switch_manager.restore_port_to_default_vlan(interface_name)
         
         if success:
-            logger.info(f"[{EVENT_END}] Successfully restored switch interface {interface_name} to default VLAN (Event ID: {event_id})")
+            logger.info("[%s] Successfully restored switch interface %s to default VLAN (Event ID: %s)", EVENT_END, interface_name, event_id)
             
             # Send success notification
             notification.send_switch_port_notification(
@@ -317,7 +572,7 @@ def handle_switch_port_end_event(
                 webhook_id=webhook_id,
                 event_type=EVENT_END,
                 success=True,
-                payload_data=json.dumps(payload.model_dump()),
+                payload_data=payload.model_dump_json,
                 status_code=200,
                 response=f"Switch port '{resource_name}' restored to default VLAN",
                 retry_count=0,
@@ -325,7 +580,7 @@ def handle_switch_port_end_event(
                 resource_id=resource_id
             )
         else:
-            logger.error(f"[{EVENT_END}] Failed to restore switch interface {interface_name} to default VLAN (Event ID: {event_id})")
+            logger.error("[%s] Failed to restore switch interface %s to default VLAN (Event ID: %s)", EVENT_END, interface_name, event_id)
             
             # Send failure notification
             notification.send_switch_port_notification(
@@ -342,7 +597,7 @@ def handle_switch_port_end_event(
         return success
         
     except Exception as e:
-        logger.error(f"Error restoring switch port '{resource_name}': {str(e)}")
+        logger.error("Error restoring switch port '%s': %s", resource_name, e)
         
         # Send failure notification
         notification.send_switch_port_notification(
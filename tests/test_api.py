@@ -0,0 +1,69 @@
+"""Tests for the webhook API endpoints."""
+import os
+import time
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+from app import utils
+from app.main import app
+
+
+def _deleted_event(event_id: int, timestamp: str) -> dict:
+    """Build an EVENT_DELETED payload for a reservation from 09:00 to 10:00 UTC."""
+    return {
+        "eventType": "EVENT_DELETED",
+        "timestamp": timestamp,
+        "webhookId": "3",
+        "data": {
+            "id": event_id,
+            "start": "2025-07-06T09:00:00Z",
+            "end": "2025-07-06T10:00:00Z",
+            "resource": {"id": 4, "name": "Hu1/0/1"},
+            "keycloakId": "user-1",
+        },
+    }
+
+
+class EventDeletedWindowTest(unittest.TestCase):
+    """EVENT_DELETED restores the port only while the reservation is active."""
+
+    def setUp(self):
+        # A host timezone far from UTC exposes naive timestamps read as local time
+        self._tz = os.environ.get("TZ")
+        os.environ["TZ"] = "America/New_York"
+        time.tzset()
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        if self._tz is None:
+            os.environ.pop("TZ", None)
+        else:
+            os.environ["TZ"] = self._tz
+        time.tzset()
+
+    def test_naive_timestamp_inside_window_restores_port(self):
+        with mock.patch.object(utils, "handle_switch_port_end_event", return_value=True) as handler:
+            response = self.client.post("/webhook", json=_deleted_event(101, "2025-07-06T09:30:00"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("restored to default VLAN", response.json()["message"])
+        handler.assert_called_once()
+
+    def test_zulu_timestamp_inside_window_restores_port(self):
+        with mock.patch.object(utils, "handle_switch_port_end_event", return_value=True) as handler:
+            response = self.client.post("/webhook", json=_deleted_event(102, "2025-07-06T09:30:00Z"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("restored to default VLAN", response.json()["message"])
+        handler.assert_called_once()
+
+    def test_naive_timestamp_outside_window_takes_no_action(self):
+        with mock.patch.object(utils, "handle_switch_port_end_event", return_value=True) as handler:
+            response = self.client.post("/webhook", json=_deleted_event(103, "2025-07-06T10:30:00"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("not currently active", response.json()["message"])
+        handler.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+"""Tests for the switch port service."""
+import unittest
+
+from app import config
+from app.services.switch import SwitchPortManager
+
+
+class IsValidPortTest(unittest.TestCase):
+    """Interface names accepted and rejected before they reach the switch CLI."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.manager = SwitchPortManager()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.manager.close()
+
+    def test_accepts_interface_names(self):
+        for name in (
+            "Hu1/0/1",
+            "GigabitEthernet1/0/24",
+            "GigabitEthernet 1/0/1",
+            "Port-channel1",
+            "Gi1/0/1.100",
+            "1/1/1",
+            "ethernet1/1:2",
+            "port_1",
+        ):
+            with self.subTest(name=name):
+                self.assertTrue(self.manager._is_valid_port(name, "100"))
+
+    def test_rejects_names_that_could_inject_commands(self):
+        for name in (
+            "",
+            "Gi1/0/1\nno vlan 100",
+            "Gi1/0/1\rreload",
+            "Gi1/0/1\tshutdown",
+            "Gi1/0/1\x00",
+            "Gi1/0/1; reload",
+            "Gi1/0/1 | include",
+            "Gi1/0/1 ?",
+        ):
+            with self.subTest(name=name):
+                with self.assertLogs(config.logger, level="ERROR"):
+                    self.assertFalse(self.manager._is_valid_port(name, "100"))
+
+    def test_rejects_missing_vlan_id(self):
+        with self.assertLogs(config.logger, level="ERROR"):
+            self.assertFalse(self.manager._is_valid_port("Gi1/0/1", ""))
+
+
+if __name__ == "__main__":
+    unittest.main()
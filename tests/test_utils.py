@@ -0,0 +1,36 @@
+"""Tests for the webhook utility functions."""
+import os
+import time
+import unittest
+
+from app import utils
+
+
+class UtcTimestampTest(unittest.TestCase):
+    """Payload timestamps with and without an offset compare as UTC on any host."""
+
+    def setUp(self):
+        self._tz = os.environ.get("TZ")
+        os.environ["TZ"] = "America/New_York"
+        time.tzset()
+
+    def tearDown(self):
+        if self._tz is None:
+            os.environ.pop("TZ", None)
+        else:
+            os.environ["TZ"] = self._tz
+        time.tzset()
+
+    def test_naive_timestamp_is_read_as_utc(self):
+        naive = utils.parse_timestamp("2025-07-06T09:30:00")
+        zulu = utils.parse_timestamp("2025-07-06T09:30:00Z")
+        self.assertEqual(utils.utc_timestamp(naive), utils.utc_timestamp(zulu))
+        self.assertEqual(utils.utc_timestamp(zulu), 1751794200.0)
+
+    def test_offset_timestamp_keeps_its_offset(self):
+        offset = utils.parse_timestamp("2025-07-06T11:30:00+02:00")
+        self.assertEqual(utils.utc_timestamp(offset), 1751794200.0)
+
+
+if __name__ == "__main__":
+    unittest.main()